@@ -0,0 +1,96 @@
+"""Benchmarks for dspy_minimal.
+
+1. Scorers against similarity_score (SequenceMatcher).
+
+Generates pairs of long outputs/expecteds where the expected text is a noisy
+edit of the output, then reports pairs per second for each scorer and its
+agreement (mean absolute difference, Pearson r) with similarity_score and with
+SequenceMatcher without its autojunk heuristic, which makes similarity_score
+collapse towards 0 on texts longer than 200 characters.
+
+2. Prompt rendering for a candidates x dataset grid: str.format per pair
+versus PromptCandidate.render and render_many on precompiled templates.
+
+Run: python bench_dspy_minimal.py [pairs] [length]
+"""
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+from dspy_minimal import (
+    PromptCandidate, edit_similarity, np, score_many, similarity_score, token_set_similarity,
+)
+
+def make_pairs(n, length, seed=0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    WORDS = ["".join(rng.choice(letters) for _ in range(rng.randint(2, 9))) for _ in range(2000)]
+    pairs = []
+    for _ in range(n):
+        words = [rng.choice(WORDS) for _ in range(length // 6)]
+        noisy = [w if rng.random() > 0.2 else rng.choice(WORDS) for w in words]
+        pairs.append((" ".join(words), " ".join(noisy)))
+    return pairs
+
+
+def pearson(xs, ys):
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    vx = sum((x - mx) ** 2 for x in xs) ** 0.5
+    vy = sum((y - my) ** 2 for y in ys) ** 0.5
+    return cov / (vx * vy) if vx and vy else 1.0
+
+
+def main(n=300, length=400):
+    pairs = make_pairs(n, length)
+    outputs = [a for a, _ in pairs]
+    expecteds = [b for _, b in pairs]
+    runs = [
+        ("similarity_score", lambda: [similarity_score(a, b) for a, b in pairs]),
+        ("SequenceMatcher(no junk)", lambda: [SequenceMatcher(None, a, b, autojunk=False).ratio() for a, b in pairs]),
+        ("token_set_similarity", lambda: [token_set_similarity(a, b) for a, b in pairs]),
+        ("edit_similarity", lambda: [edit_similarity(a, b) for a, b in pairs]),
+        ("edit_similarity(max=40)", lambda: [edit_similarity(a, b, max_distance=40) for a, b in pairs]),
+        ("score_many" + ("" if np is not None else " (no numpy)"), lambda: score_many(outputs, expecteds)),
+    ]
+    print(f"{n} pairs of ~{length} chars")
+    print(f"{'scorer':26} {'pairs/s':>10}   vs similarity_score   vs no-junk ratio")
+    references = []
+    for name, fn in runs:
+        start = time.perf_counter()
+        scores = fn()
+        elapsed = time.perf_counter() - start
+        if len(references) < 2:
+            references.append(scores)
+        agreement = "".join(
+            f"   |d| {sum(abs(x - y) for x, y in zip(scores, ref)) / n:.3f} r {pearson(scores, ref):.3f}"
+            for ref in references
+        )
+        print(f"{name:26} {n / elapsed:10.0f}{agreement}")
+
+
+def bench_render(n_candidates=200, n_examples=2000):
+    candidates = [PromptCandidate(f"Variant {i}. Answer carefully.\nInput: {{input}}\nAnswer:") for i in range(n_candidates)]
+    inputs = [f"example input number {i} with some text" for i in range(n_examples)]
+    grid = n_candidates * n_examples
+    runs = [
+        ("str.format", lambda: [[c.prompt.format(input=x) for x in inputs] for c in candidates]),
+        ("render", lambda: [[c.render(x) for x in inputs] for c in candidates]),
+        ("render_many", lambda: [c.render_many(inputs) for c in candidates]),
+    ]
+    print(f"\nrendering {n_candidates} candidates x {n_examples} examples")
+    reference = None
+    for name, fn in runs:
+        start = time.perf_counter()
+        prompts = fn()
+        elapsed = time.perf_counter() - start
+        reference = reference or prompts
+        print(f"{name:26} {grid / elapsed / 1e6:8.2f} M prompts/s  identical: {prompts == reference}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
+    bench_render()
@@ -0,0 +1,49 @@
+"""Benchmark: float vs Money (integer cents) aggregation in finance_srp.
+
+Builds a synthetic history of random 2-decimal amounts and sums it three ways:
+ - float: the previous representation (one float object per entry),
+ - Money: Money.sum over Money objects,
+ - cents array: the int64 column ColumnarLedger stores.
+Each result is compared with an exact Decimal total.
+
+Run: python bench_finance_srp.py [entries]
+"""
+import random
+import sys
+import time
+from array import array
+from decimal import Decimal
+
+from finance_srp import Money
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(n: int = 1_000_000) -> None:
+    rng = random.Random(42)
+    cents = [rng.randint(-500_000, 500_000) for _ in range(n)]
+    texts = [f'{c / 100:.2f}' for c in cents]
+    exact = sum(Decimal(t) for t in texts)
+
+    floats = [float(t) for t in texts]
+    monies = [Money.from_cents(c) for c in cents]
+    column = array('q', cents)
+
+    runs = [
+        ('float', lambda: sum(floats)),
+        ('Money', lambda: Money.sum(monies)),
+        ('cents array', lambda: Money.from_cents(sum(column))),
+    ]
+    print(f'{n} entries, exact total {exact}')
+    for name, fn in runs:
+        total, elapsed = timed(fn)
+        error = Decimal(repr(total)) - exact if isinstance(total, float) else total.to_decimal() - exact
+        print(f'{name:12} {n / elapsed / 1e6:8.2f} M entries/s  error {error}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
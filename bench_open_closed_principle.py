@@ -0,0 +1,43 @@
+"""Benchmark: GatewayPayment charges per second by connection-pool size.
+
+Starts a StubGatewayServer with a fixed per-request latency and fires a burst
+of concurrent charges through a GatewayPayment whose ConnectionPool holds
+1..N connections. Throughput should grow with the pool until the client
+saturates.
+
+Run: python bench_open_closed_principle.py [max_pool] [latency_ms] [charges]
+"""
+import asyncio
+import sys
+import time
+
+from open_closed_principle import ConnectionPool, GatewayPayment, StubGatewayServer
+
+
+async def burst(method: GatewayPayment, charges: int) -> int:
+    results = await asyncio.gather(*(method.process(1.0) for _ in range(charges)))
+    return sum(results)
+
+
+def main(max_pool: int = 16, latency_ms: float = 5.0, charges: int = 2000) -> None:
+    with StubGatewayServer(latency=latency_ms / 1000) as server:
+        print(f'latency {latency_ms} ms, {charges} charges per run')
+        size = 1
+        while size <= max_pool:
+            method = GatewayPayment(ConnectionPool(server.host, server.port, size=size))
+
+            async def run():
+                start = time.perf_counter()
+                ok = await burst(method, charges)
+                elapsed = time.perf_counter() - start
+                await method.aclose()
+                return ok, elapsed
+
+            ok, elapsed = asyncio.run(run())
+            print(f'pool {size:3}: {charges / elapsed:10.0f} charges/s ({ok} ok)')
+            size *= 2
+
+
+if __name__ == '__main__':
+    args = [float(a) for a in sys.argv[1:]]
+    main(int(args[0]) if args else 16, args[1] if len(args) > 1 else 5.0, int(args[2]) if len(args) > 2 else 2000)
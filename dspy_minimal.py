@@ -1,53 +1,459 @@
 # dspy_minimal.py
-from typing import Callable, List, Tuple
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from string import Formatter
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from difflib import SequenceMatcher
 
+try:
+    import numpy as np
+except ImportError:  # score_many falls back to pure Python
+    np = None
+
+_FORMATTER = Formatter()
+
+
+class _AnyLookup:
+    """Stand-in input that satisfies any index/attribute chain, so only its syntax is checked."""
+
+    def __getattr__(self, name):
+        return self
+
+    def __getitem__(self, key):
+        return self
+
+
+def _compile_template(prompt: str):
+    """
+    Split a prompt template into literal segments and {input} fields, validating it.
+    Fields may index or take attributes of the input ({input[0]}, {input.attr}),
+    as with str.format. Raises ValueError for malformed braces or placeholders
+    other than {input}.
+    """
+    try:
+        parsed = list(_FORMATTER.parse(prompt))
+    except ValueError as exc:
+        raise ValueError(f"invalid prompt template {prompt!r}: {exc}") from None
+    literals, fields = [""], []
+    for literal, name, spec, conversion in parsed:
+        literals[-1] += literal
+        if name is None:
+            continue
+        if name != "input" and not name.startswith(("input.", "input[")):
+            raise ValueError(f"prompt template {prompt!r} has unknown placeholder {{{name}}}; only {{input}} is supplied")
+        try:
+            _FORMATTER.get_field(name, (), {"input": _AnyLookup()})
+        except ValueError as exc:
+            raise ValueError(f"invalid prompt template {prompt!r}: {exc}") from None
+        if "{" in (spec or ""):
+            raise ValueError(f"prompt template {prompt!r} uses a nested format spec")
+        if conversion not in (None, "r", "s", "a"):
+            raise ValueError(f"prompt template {prompt!r} uses unknown conversion !{conversion}")
+        fields.append((name, conversion, spec or ""))
+        literals.append("")
+    return literals, fields
+
+_CONVERSIONS = {None: lambda v: v, "s": str, "r": repr, "a": ascii}
+
 class PromptCandidate:
+    """
+    A prompt template plus model params. The template is parsed and validated once here;
+    render() then only joins precomputed literal segments around the input.
+    """
     def __init__(self, prompt: str, params: dict = None):
         self.prompt = prompt
         self.params = params or {}
+        self._literals, self._fields = _compile_template(prompt)
+        self._plain = all(
+            name == "input" and conv is None and not spec for name, conv, spec in self._fields
+        )
+
+    def render(self, input_text: str) -> str:
+        """Same result as prompt.format(input=input_text)."""
+        if self._plain:
+            return str(input_text).join(self._literals)
+        parts = [self._literals[0]]
+        for (name, conv, spec), literal in zip(self._fields, self._literals[1:]):
+            value = input_text
+            if name != "input":
+                value = _FORMATTER.get_field(name, (), {"input": input_text})[0]
+            parts.append(format(_CONVERSIONS[conv](value), spec))
+            parts.append(literal)
+        return "".join(parts)
+
+    def render_many(self, inputs: Iterable[str]) -> List[str]:
+        """Render the template for every input in one pass."""
+        if self._plain:
+            literals = self._literals
+            return [str(x).join(literals) for x in inputs]
+        return [self.render(x) for x in inputs]
+
+Dataset = Union[str, Iterable[Tuple[str, str]]]
+
+def iter_jsonl(path: str, input_key: str = "input", expected_key: str = "expected") -> Iterator[Tuple[str, str]]:
+    """Stream (input, expected) pairs from a JSONL file, one JSON object per line."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield row[input_key], row[expected_key]
+
+class RunningStats:
+    """
+    Constant-memory count / mean / variance of a stream of scores (Welford).
+    mean is total / count, so it matches sum(scores) / len(scores) exactly.
+    """
+    def __init__(self, count: int = 0, total: float = 0.0, m2: float = 0.0, running_mean: float = 0.0):
+        self.count = count
+        self.total = total
+        self.m2 = m2
+        self._running_mean = running_mean
+
+    def add(self, score: float):
+        self.count += 1
+        self.total += score
+        delta = score - self._running_mean
+        self._running_mean += delta / self.count
+        self.m2 += delta * (score - self._running_mean)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 with fewer than two scores)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total": self.total, "m2": self.m2, "running_mean": self._running_mean}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningStats":
+        return cls(d["count"], d["total"], d["m2"], d["running_mean"])
+
+class ModelCache:
+    """
+    Thread-safe LRU memo of (formatted prompt, params) -> model output.
+    If path is given, entries are loaded from / saved to that JSON file so repeated
+    optimizer runs reuse earlier model calls. hits/misses give the hit rate.
+    Concurrent requests for a key that is already being computed wait for that call.
+    """
+    def __init__(self, maxsize: int = 100_000, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for prompt, params_key, output in json.load(f):
+                    self._data[(prompt, params_key)] = output
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    @staticmethod
+    def key(prompt: str, params: dict) -> Tuple[str, str]:
+        return prompt, json.dumps(params, sort_keys=True, default=repr)
+
+    def get_or_call(self, model_fn: Callable[[str, dict], str], prompt: str, params: dict) -> str:
+        key = self.key(prompt, params)
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._inflight[key] = Future()
+        if pending is not None:
+            return pending.result()
+        try:
+            out = model_fn(prompt, params)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key).set_exception(exc)
+            raise
+        with self._lock:
+            self._data[key] = out
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._inflight.pop(key).set_result(out)
+        return out
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "size": len(self)}
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            raise ValueError("no path given for ModelCache.save")
+        with self._lock:
+            rows = [[prompt, params_key, out] for (prompt, params_key), out in self._data.items()]
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(rows, f)
+        os.replace(tmp, path)
 
 class PromptOptimizer:
     """
     Very small optimizer that scores candidate prompts using a provided model function
     and scorer. Strategy: evaluate all candidates (grid-like).
     """
-    def __init__(self, model_fn: Callable[[str, dict], str], scorer_fn: Callable[[str, str], float]):
+    def __init__(self, model_fn: Callable[[str, dict], str], scorer_fn: Callable[[str, str], float],
+                 max_workers: int = 1, cache: Optional[ModelCache] = None,
+                 batch_scorer_fn: Optional[Callable[[Sequence[str], Sequence[str]], List[float]]] = None):
         """
         model_fn(prompt, params) -> model_output (str)
         scorer_fn(output, expected) -> score (higher is better)
+        max_workers: number of model calls allowed in flight at once (thread pool).
+        cache: optional ModelCache memoizing model calls across evaluations/runs.
+        batch_scorer_fn(outputs, expecteds) -> scores; if given (e.g. score_many) it scores
+        each candidate's outputs in one call instead of calling scorer_fn per example.
         """
         self.model_fn = model_fn
         self.scorer_fn = scorer_fn
+        self.max_workers = max_workers
+        self.cache = cache
+        self.batch_scorer_fn = batch_scorer_fn
+
+    def _call_model(self, prompt_text: str, params: dict) -> str:
+        if self.cache is not None:
+            return self.cache.get_or_call(self.model_fn, prompt_text, params)
+        return self.model_fn(prompt_text, params)
+
+    def _run_example(self, cand: PromptCandidate, input_text: str) -> str:
+        # For this minimal example, we assume candidate.prompt contains {input}
+        return self._call_model(cand.render(input_text), cand.params)
 
-    def evaluate_candidates(self, candidates: List[PromptCandidate], dataset: List[Tuple[str, str]]):
+    def _score_grid(self, candidates: List[PromptCandidate], dataset: List[Tuple[str, str]]) -> List[List[float]]:
+        """Scores of every candidate on every example, one row per candidate."""
+        if self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [
+                    [pool.submit(self._run_example, cand, input_text) for input_text, _ in dataset]
+                    for cand in candidates
+                ]
+                outputs = [[f.result() for f in row] for row in futures]
+        else:
+            inputs = [input_text for input_text, _ in dataset]
+            outputs = [
+                [self._call_model(prompt_text, cand.params) for prompt_text in cand.render_many(inputs)]
+                for cand in candidates
+            ]
+        expecteds = [expected for _, expected in dataset]
+        if self.batch_scorer_fn is not None:
+            return [list(self.batch_scorer_fn(row, expecteds)) for row in outputs]
+        return [[self.scorer_fn(out, expected) for out, expected in zip(row, expecteds)] for row in outputs]
+
+    def evaluate_candidates(self, candidates: List[PromptCandidate], dataset: Dataset, chunk_size: int = 1024):
         """
-        dataset: list of (input_payload, expected_output) pairs. The optimizer will format/insert
-        the input into candidate.prompt as needed.
+        dataset: (input_payload, expected_output) pairs as a list, any iterable, or the path
+        of a JSONL file. The optimizer will format/insert the input into candidate.prompt as needed.
         Returns mapping candidate -> avg score.
+        With max_workers > 1 the (candidate, example) model calls run concurrently.
+        """
+        return [(cand, stats.mean) for cand, stats in self.evaluate_stream(candidates, dataset, chunk_size)]
+
+    def evaluate_stream(self, candidates: List[PromptCandidate], dataset: Dataset, chunk_size: int = 1024,
+                        checkpoint_path: Optional[str] = None):
+        """
+        Evaluate in constant memory: examples are pulled chunk_size at a time and folded
+        into a RunningStats per candidate. With checkpoint_path the stats and number of
+        examples consumed are saved after every chunk, and a rerun with the same
+        candidates resumes after the last saved chunk instead of starting over.
+        Returns a list of (candidate, RunningStats).
         """
-        results = []
-        for cand in candidates:
-            scores = []
-            for input_text, expected in dataset:
-                # For this minimal example, we assume candidate.prompt contains {input}
-                prompt_text = cand.prompt.format(input=input_text)
-                out = self.model_fn(prompt_text, cand.params)
-                score = self.scorer_fn(out, expected)
-                scores.append(score)
-            avg = sum(scores) / len(scores) if scores else 0.0
-            results.append((cand, avg))
-        return results
-
-    def best_candidate(self, candidates: List[PromptCandidate], dataset: List[Tuple[str, str]]):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        examples = iter_jsonl(dataset) if isinstance(dataset, str) else iter(dataset)
+        prompts = [cand.prompt for cand in candidates]
+        stats = [RunningStats() for _ in candidates]
+        seen = 0
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                state = json.load(f)
+            if state["prompts"] != prompts:
+                raise ValueError("checkpoint was written for different candidates")
+            seen = state["examples_seen"]
+            stats = [RunningStats.from_dict(d) for d in state["stats"]]
+            examples = islice(examples, seen, None)
+
+        while chunk := list(islice(examples, chunk_size)):
+            for cand_stats, row in zip(stats, self._score_grid(candidates, chunk)):
+                for score in row:
+                    cand_stats.add(score)
+            seen += len(chunk)
+            if checkpoint_path:
+                state = {"prompts": prompts, "examples_seen": seen, "stats": [st.to_dict() for st in stats]}
+                with open(checkpoint_path + ".tmp", "w") as f:
+                    json.dump(state, f)
+                os.replace(checkpoint_path + ".tmp", checkpoint_path)
+        return list(zip(candidates, stats))
+
+    def best_candidate(self, candidates: List[PromptCandidate], dataset: Dataset):
         scored = self.evaluate_candidates(candidates, dataset)
         scored.sort(key=lambda x: x[1], reverse=True)
         return scored[0] if scored else (None, 0.0)
 
+    def successive_halving(self, candidates: List[PromptCandidate], dataset: List[Tuple[str, str]],
+                           eta: int = 2, min_examples: int = 2):
+        """
+        Budgeted alternative to best_candidate. All candidates are scored on the first
+        min_examples examples; only the top 1/eta survive and the subset grows eta-fold,
+        reusing the scores already computed, until one candidate is left or the whole
+        dataset is used. Put examples in random order if the dataset is sorted.
+        Returns (best_candidate, avg_score, stats) where stats reports model_calls,
+        exhaustive_calls (len(candidates) * len(dataset)) and calls_saved.
+        """
+        if eta < 2 or min_examples < 1:
+            raise ValueError("eta must be >= 2 and min_examples >= 1")
+        exhaustive = len(candidates) * len(dataset)
+        if not candidates or not dataset:
+            return None, 0.0, {"model_calls": 0, "exhaustive_calls": exhaustive, "calls_saved": exhaustive}
+
+        totals = [0.0] * len(candidates)
+        alive = list(range(len(candidates)))
+        seen = 0
+        budget = min(min_examples, len(dataset))
+        calls = 0
+        while True:
+            new_examples = dataset[seen:budget]
+            rows = self._score_grid([candidates[i] for i in alive], new_examples)
+            for i, row in zip(alive, rows):
+                totals[i] += sum(row)
+            calls += len(alive) * len(new_examples)
+            seen = budget
+            alive.sort(key=lambda i: totals[i], reverse=True)
+            if len(alive) == 1 or seen == len(dataset):
+                break
+            alive = alive[:max(1, math.ceil(len(alive) / eta))]
+            budget = min(len(dataset), seen * eta)
+
+        best = alive[0]
+        stats = {"model_calls": calls, "exhaustive_calls": exhaustive, "calls_saved": exhaustive - calls}
+        return candidates[best], totals[best] / seen, stats
+
 # Simple scoring: normalized sequence similarity
 def similarity_score(output: str, expected: str) -> float:
     return SequenceMatcher(None, output.strip(), expected.strip()).ratio()
 
+# Fast scoring: token-set (Jaccard) similarity, linear in the text length
+def token_set_similarity(output: str, expected: str) -> float:
+    a, b = set(output.split()), set(expected.split())
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Levenshtein distance. With max_distance only a diagonal band of that width is
+    computed (O(max_distance * len)) and max_distance + 1 is returned once exceeded.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    bound = max_distance if max_distance is not None else len(a)
+    if len(a) - len(b) > bound:
+        return bound + 1
+    inf = bound + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - bound), min(len(b), i + bound)
+        cur = [inf] * (len(b) + 1)
+        cur[0] = i if i <= bound else inf
+        best = cur[0]
+        for j in range(lo, hi + 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != b[j - 1]))
+            cur[j] = d
+            if d < best:
+                best = d
+        if best > bound:
+            return inf
+        prev = cur
+    return min(prev[len(b)], inf)
+
+# Normalized edit similarity: 1 - distance / longer length (0.0 beyond max_distance)
+def edit_similarity(output: str, expected: str, max_distance: Optional[int] = None) -> float:
+    a, b = output.strip(), expected.strip()
+    longest = max(len(a), len(b))
+    if longest == 0:
+        return 1.0
+    d = edit_distance(a, b, max_distance)
+    if max_distance is not None and d > max_distance:
+        return 0.0
+    return 1.0 - d / longest
+
+def _edit_distances_np(a_list: List[str], b_list: List[str]):
+    """Levenshtein distances of many pairs at once; one NumPy row update per character of a."""
+    n = len(a_list)
+    la = np.array([len(a) for a in a_list], dtype=np.int64)
+    lb = np.array([len(b) for b in b_list], dtype=np.int64)
+    width = int(lb.max(initial=0))
+    A = np.full((n, int(la.max(initial=0))), -1, dtype=np.int64)
+    B = np.full((n, width), -2, dtype=np.int64)
+    cols = np.arange(width + 1, dtype=np.int32)
+    for k, (a, b) in enumerate(zip(a_list, b_list)):
+        A[k, :len(a)] = np.frombuffer(a.encode("utf-32-le"), dtype=np.uint32)
+        B[k, :len(b)] = np.frombuffer(b.encode("utf-32-le"), dtype=np.uint32)
+    prev = np.tile(cols, (n, 1))
+    dist = lb.copy()  # pairs with an empty a
+    for i in range(1, A.shape[1] + 1):
+        cur = np.empty_like(prev)
+        cur[:, 0] = i
+        cur[:, 1:] = np.minimum(prev[:, 1:] + 1, prev[:, :-1] + (A[:, i - 1:i] != B))
+        # insertions: cur[j] = min over k <= j of (cur[k] + j - k)
+        cur = np.minimum.accumulate(cur - cols, axis=1) + cols
+        done = la == i
+        if done.any():
+            dist[done] = cur[done, lb[done]]
+        prev = cur
+    return dist
+
+def score_many(outputs: Sequence[str], expecteds: Sequence[str], chunk_size: int = 512) -> List[float]:
+    """
+    Batch edit_similarity for a whole dataset. With NumPy available, pairs are grouped
+    by length into chunks and each chunk is scored by a single vectorized DP pass.
+    """
+    if len(outputs) != len(expecteds):
+        raise ValueError("outputs and expecteds must have the same length")
+    a_list = [o.strip() for o in outputs]
+    b_list = [e.strip() for e in expecteds]
+    if np is None:
+        return [edit_similarity(a, b) for a, b in zip(a_list, b_list)]
+    scores = [0.0] * len(a_list)
+    order = sorted(range(len(a_list)), key=lambda k: (len(a_list[k]), len(b_list[k])))
+    for start in range(0, len(order), chunk_size):
+        idx = order[start:start + chunk_size]
+        dist = _edit_distances_np([a_list[k] for k in idx], [b_list[k] for k in idx])
+        for k, d in zip(idx, dist.tolist()):
+            longest = max(len(a_list[k]), len(b_list[k]))
+            scores[k] = 1.0 - d / longest if longest else 1.0
+    return scores
+
+SCORERS = {
+    "sequence": similarity_score,
+    "edit": edit_similarity,
+    "token_set": token_set_similarity,
+}
+
 # Example simulated model function that depends on prompt wording
 def simulated_model(prompt: str, params: dict):
     # Simple rule-based simulator: look for keywords to decide output
@@ -1,16 +1,153 @@
 """Single Responsibility Principle example in the finance domain.
 
 Classes:
+ - Money: exact fixed-point amount stored as integer minor units (cents).
  - Account: simple data holder for account information.
  - Ledger: records transaction entries (immutable responsibility: record-keeping).
+ - ColumnarLedger: Ledger backend with a per-account index and typed-array columns.
+ - FileLedger: persistent, append-only, memory-mapped Ledger backend with crash recovery.
+ - SynchronizedLedger: wraps any Ledger so it can be shared between threads.
  - NotificationService: sends notifications (printing in this demo).
+ - QueuedNotificationService: hands notifications to a background NotificationDispatcher.
  - TransactionService: performs deposits/withdrawals and coordinates ledger + notifications.
- - ReportGenerator: builds account statements from ledger entries.
+ - Transaction / TransactionResult: input and outcome of a batched transaction.
+ - ConcurrentTransactionService: TransactionService safe to call from many threads (lock striping).
+ - ReportGenerator: builds account statements from ledger entries (whole or streamed).
+ - IncrementalStatements: per-account cursors for "statement since last run".
 
 Each class has one reason to change.
 """
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
 from dataclasses import dataclass
-from typing import List, Dict
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from notification_dispatcher import NotificationDispatcher
+
+
+class Money:
+    """Exact monetary amount held as an integer number of cents.
+
+    Money(x) accepts Money, int, float, str or Decimal and rounds to the cent
+    (half-even). Arithmetic works against Money and plain numbers, so
+    Money('0.10') + 0.2 == 0.3 holds exactly, and amounts format like floats
+    (f'{m:.2f}'). Comparisons with Money, int and float are exact, with a
+    float taken at its shortest repr (so Money('0.30') != 0.304); hashes
+    match the equal float.
+    """
+
+    __slots__ = ('cents',)
+    _CENT = Decimal('0.01')
+
+    def __init__(self, amount: 'MoneyLike' = 0):
+        if isinstance(amount, Money):
+            self.cents = amount.cents
+        elif isinstance(amount, int):
+            self.cents = amount * 100
+        else:
+            if isinstance(amount, float):
+                amount = repr(amount)
+            self.cents = int(Decimal(amount).quantize(self._CENT, ROUND_HALF_EVEN) * 100)
+
+    @classmethod
+    def from_cents(cls, cents: int) -> 'Money':
+        m = cls.__new__(cls)
+        m.cents = cents
+        return m
+
+    @classmethod
+    def sum(cls, amounts: Iterable['MoneyLike']) -> 'Money':
+        return cls.from_cents(sum(a.cents if isinstance(a, Money) else Money(a).cents for a in amounts))
+
+    @staticmethod
+    def _cents_of(other) -> Optional[int]:
+        if isinstance(other, Money):
+            return other.cents
+        if isinstance(other, (int, float, Decimal)) and not isinstance(other, bool):
+            return Money(other).cents
+        return None
+
+    def _operands(self, other) -> Optional[Tuple[Union[int, Decimal], Union[int, Decimal]]]:
+        """Exactly comparable (self, other) values: cents for Money and int,
+        Decimals for a float (taken at its shortest repr)."""
+        if isinstance(other, Money):
+            return self.cents, other.cents
+        if isinstance(other, int) and not isinstance(other, bool):
+            return self.cents, other * 100
+        if isinstance(other, float) and other == other:
+            return self.to_decimal(), Decimal(repr(other))
+        return None
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def __add__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else Money.from_cents(self.cents + cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else Money.from_cents(self.cents - cents)
+
+    def __rsub__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else Money.from_cents(cents - self.cents)
+
+    def __neg__(self):
+        return Money.from_cents(-self.cents)
+
+    def __eq__(self, other):
+        pair = self._operands(other)
+        return NotImplemented if pair is None else pair[0] == pair[1]
+
+    def __lt__(self, other):
+        pair = self._operands(other)
+        return NotImplemented if pair is None else pair[0] < pair[1]
+
+    def __le__(self, other):
+        pair = self._operands(other)
+        return NotImplemented if pair is None else pair[0] <= pair[1]
+
+    def __gt__(self, other):
+        pair = self._operands(other)
+        return NotImplemented if pair is None else pair[0] > pair[1]
+
+    def __ge__(self, other):
+        pair = self._operands(other)
+        return NotImplemented if pair is None else pair[0] >= pair[1]
+
+    def __hash__(self):
+        return hash(float(self))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __format__(self, spec: str) -> str:
+        return format(self.to_decimal(), spec)
+
+    def __str__(self):
+        return str(self.to_decimal())
+
+    def __repr__(self):
+        return f"Money('{self.to_decimal()}')"
+
+
+MoneyLike = Union[Money, int, float, str, Decimal]
+
+
+def _cents(amount: MoneyLike) -> int:
+    return amount.cents if isinstance(amount, Money) else Money(amount).cents
 
 
 @dataclass
@@ -18,7 +155,10 @@ class Account:
     account_id: str
     owner: str
     email: str
-    balance: float = 0.0
+    balance: Money = Money(0)
+
+    def __post_init__(self):
+        self.balance = Money(self.balance)
 
 
 class Ledger:
@@ -27,18 +167,269 @@ class Ledger:
     def __init__(self):
         self._entries: List[Dict] = []
 
-    def record(self, account_id: str, kind: str, amount: float, balance: float) -> None:
+    def record(self, account_id: str, kind: str, amount: MoneyLike, balance: MoneyLike) -> None:
         entry = {
             'account_id': account_id,
             'type': kind,
-            'amount': amount,
-            'balance': balance,
+            'amount': Money(amount),
+            'balance': Money(balance),
         }
         self._entries.append(entry)
 
+    def record_many(self, rows: Iterable[Tuple[str, str, MoneyLike, MoneyLike]]) -> None:
+        """Record many (account_id, kind, amount, balance) rows in one call."""
+        self._entries.extend(
+            {'account_id': account_id, 'type': kind, 'amount': Money(amount), 'balance': Money(balance)}
+            for account_id, kind, amount, balance in rows
+        )
+
     def entries_for(self, account_id: str) -> List[Dict]:
         return [e for e in self._entries if e['account_id'] == account_id]
 
+    def iter_entries(self, account_id: str, start: int = 0) -> Iterator[Dict]:
+        """Yield the entries of one account, skipping its first `start` entries."""
+        seen = 0
+        for e in self._entries:
+            if e['account_id'] == account_id:
+                if seen >= start:
+                    yield e
+                seen += 1
+
+
+class _AccountColumns:
+    """Typed-array columns (amounts/balances in cents) for a single account."""
+
+    __slots__ = ('kinds', 'amounts', 'balances')
+
+    def __init__(self):
+        self.kinds = array('H')
+        self.amounts = array('q')
+        self.balances = array('q')
+
+
+class ColumnarLedger(Ledger):
+    """Ledger that indexes entries by account and stores them column-wise.
+
+    Entries are kept per account in typed arrays (amount, balance) with the
+    transaction kind interned to a small integer code, so a lookup only touches
+    the entries of the requested account and no dict is kept per row.
+    """
+
+    def __init__(self):
+        self._accounts: Dict[str, _AccountColumns] = {}
+        self._kind_codes: Dict[str, int] = {}
+        self._kinds: List[str] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    MAX_KINDS = 1 << 16  # kind codes are stored as array('H')
+
+    def _kind_code(self, kind: str) -> int:
+        code = self._kind_codes.get(kind)
+        if code is None:
+            code = len(self._kinds)
+            if code >= self.MAX_KINDS:
+                raise ValueError(f'at most {self.MAX_KINDS} distinct kinds are supported')
+            self._kind_codes[kind] = code
+            self._kinds.append(kind)
+        return code
+
+    def record(self, account_id: str, kind: str, amount: MoneyLike, balance: MoneyLike) -> None:
+        # Convert everything before touching the columns so a bad value
+        # cannot leave them with different lengths.
+        amount_cents, balance_cents = _cents(amount), _cents(balance)
+        code = self._kind_code(kind)
+        columns = self._accounts.get(account_id)
+        if columns is None:
+            columns = self._accounts[account_id] = _AccountColumns()
+        columns.kinds.append(code)
+        columns.amounts.append(amount_cents)
+        columns.balances.append(balance_cents)
+        self._count += 1
+
+    def record_many(self, rows: Iterable[Tuple[str, str, MoneyLike, MoneyLike]]) -> None:
+        for account_id, kind, amount, balance in rows:
+            self.record(account_id, kind, amount, balance)
+
+    def entries_for(self, account_id: str) -> List[Dict]:
+        return list(self.iter_entries(account_id))
+
+    def iter_entries(self, account_id: str, start: int = 0) -> Iterator[Dict]:
+        columns = self._accounts.get(account_id)
+        if columns is None:
+            return
+        kinds = self._kinds
+        for i in range(start, len(columns.amounts)):
+            yield {
+                'account_id': account_id,
+                'type': kinds[columns.kinds[i]],
+                'amount': Money.from_cents(columns.amounts[i]),
+                'balance': Money.from_cents(columns.balances[i]),
+            }
+
+
+class FileLedger(Ledger):
+    """Ledger persisted to an append-only file of fixed-width binary records.
+
+    Each record is (account_id, kind, amount cents, balance cents, crc32). Reads unpack
+    straight from a read-only memory map of the file, and a per-account index
+    of record numbers is rebuilt on open. Writes are fsync'ed in groups of
+    sync_every records (group commit); call sync() or close() to force it.
+    On open, a torn or corrupt tail record left by a crash is truncated away.
+    """
+
+    RECORD = struct.Struct('<32s16sqqI')
+
+    def __init__(self, path: str, sync_every: int = 1000):
+        self.path = path
+        self.sync_every = sync_every
+        self._file = open(path, 'a+b')
+        self._map: Optional[mmap.mmap] = None
+        self._pending = 0
+        self._index: Dict[str, array] = {}
+        self._count = self._recover()
+        view = self._view()
+        for n in range(self._count):
+            account_id = self._unpack(view, n)[0]
+            positions = self._index.get(account_id)
+            if positions is None:
+                positions = self._index[account_id] = array('Q')
+            positions.append(n)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _recover(self) -> int:
+        size = os.fstat(self._file.fileno()).st_size
+        count = size // self.RECORD.size
+        if count:
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                while count and not self._valid(view, count - 1):
+                    count -= 1
+        if count * self.RECORD.size != size:
+            self._file.truncate(count * self.RECORD.size)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return count
+
+    def _valid(self, view, n: int) -> bool:
+        size = self.RECORD.size
+        offset = n * size
+        crc = struct.unpack_from('<I', view, offset + size - 4)[0]
+        return zlib.crc32(view[offset:offset + size - 4]) == crc
+
+    def _pack(self, account_id: str, kind: str, amount: float, balance: float) -> bytes:
+        key = account_id.encode('utf-8')
+        if len(key) > 32:
+            raise ValueError('account_id must encode to at most 32 bytes')
+        kind_bytes = kind.encode('utf-8')
+        if len(kind_bytes) > 16:
+            raise ValueError('kind must encode to at most 16 bytes')
+        payload = self.RECORD.pack(key, kind_bytes, _cents(amount), _cents(balance), 0)[:-4]
+        return payload + struct.pack('<I', zlib.crc32(payload))
+
+    def _unpack(self, view, n: int) -> Tuple[str, str, Money, Money]:
+        key, kind, amount, balance, _ = self.RECORD.unpack_from(view, n * self.RECORD.size)
+        return (
+            key.rstrip(b'\0').decode('utf-8'),
+            kind.rstrip(b'\0').decode('utf-8'),
+            Money.from_cents(amount),
+            Money.from_cents(balance),
+        )
+
+    def _view(self):
+        self._file.flush()
+        needed = self._count * self.RECORD.size
+        if self._map is None or len(self._map) < needed:
+            # The old map is not closed: iter_entries generators may still be
+            # reading it, and it is released once they drop their reference.
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if needed else None
+        return self._map
+
+    def _append(self, account_id: str) -> None:
+        positions = self._index.get(account_id)
+        if positions is None:
+            positions = self._index[account_id] = array('Q')
+        positions.append(self._count)
+        self._count += 1
+        self._pending += 1
+
+    def record(self, account_id: str, kind: str, amount: MoneyLike, balance: MoneyLike) -> None:
+        self._file.write(self._pack(account_id, kind, amount, balance))
+        self._append(account_id)
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    def record_many(self, rows: Iterable[Tuple[str, str, MoneyLike, MoneyLike]]) -> None:
+        rows = list(rows)
+        chunk = [self._pack(*row) for row in rows]  # may raise before anything is written
+        self._file.write(b''.join(chunk))
+        for row in rows:
+            self._append(row[0])
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    def entries_for(self, account_id: str) -> List[Dict]:
+        return list(self.iter_entries(account_id))
+
+    def iter_entries(self, account_id: str, start: int = 0) -> Iterator[Dict]:
+        positions = self._index.get(account_id)
+        if not positions or start >= len(positions):
+            return
+        view = self._view()
+        for i in range(start, len(positions)):
+            _, kind, amount, balance = self._unpack(view, positions[i])
+            yield {'account_id': account_id, 'type': kind, 'amount': amount, 'balance': balance}
+
+    def sync(self) -> None:
+        """Flush buffered records and fsync them to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.sync()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class SynchronizedLedger(Ledger):
+    """Serializes access to a wrapped ledger so many threads can share it."""
+
+    def __init__(self, ledger: Ledger):
+        self.inner = ledger
+        self._lock = threading.Lock()
+
+    def record(self, account_id: str, kind: str, amount: MoneyLike, balance: MoneyLike) -> None:
+        with self._lock:
+            self.inner.record(account_id, kind, amount, balance)
+
+    def record_many(self, rows: Iterable[Tuple[str, str, MoneyLike, MoneyLike]]) -> None:
+        rows = list(rows)
+        with self._lock:
+            self.inner.record_many(rows)
+
+    def entries_for(self, account_id: str) -> List[Dict]:
+        with self._lock:
+            return self.inner.entries_for(account_id)
+
+    def iter_entries(self, account_id: str, start: int = 0) -> Iterator[Dict]:
+        with self._lock:
+            entries = list(self.inner.iter_entries(account_id, start))
+        return iter(entries)
+
 
 class NotificationService:
     """Responsible only for sending notifications to users.
@@ -50,6 +441,34 @@ class NotificationService:
         print(f"Notify {email}: {subject}\n{body}\n")
 
 
+class QueuedNotificationService(NotificationService):
+    """NotificationService that enqueues instead of sending inline.
+
+    Delivery (and its I/O) happens on the dispatcher's worker threads.
+    """
+
+    def __init__(self, dispatcher: NotificationDispatcher):
+        self.dispatcher = dispatcher
+
+    def notify(self, email: str, subject: str, body: str) -> None:
+        self.dispatcher.submit(email, subject, body)
+
+
+@dataclass
+class Transaction:
+    account: Account
+    kind: str
+    amount: MoneyLike
+
+
+@dataclass
+class TransactionResult:
+    transaction: Transaction
+    ok: bool
+    balance: Money
+    error: Optional[str] = None
+
+
 class TransactionService:
     """Responsible for business rules around transactions (deposit/withdraw).
 
@@ -60,7 +479,8 @@ class TransactionService:
         self.ledger = ledger
         self.notifier = notifier
 
-    def deposit(self, account: Account, amount: float) -> None:
+    def deposit(self, account: Account, amount: MoneyLike) -> None:
+        amount = Money(amount)
         if amount <= 0:
             raise ValueError('Deposit amount must be positive')
         account.balance += amount
@@ -71,7 +491,8 @@ class TransactionService:
             f'Hi {account.owner}, your deposit of {amount:.2f} was successful. New balance: {account.balance:.2f}'
         )
 
-    def withdraw(self, account: Account, amount: float) -> None:
+    def withdraw(self, account: Account, amount: MoneyLike) -> None:
+        amount = Money(amount)
         if amount <= 0:
             raise ValueError('Withdrawal amount must be positive')
         if amount > account.balance:
@@ -90,19 +511,208 @@ class TransactionService:
             f'Hi {account.owner}, your withdrawal of {amount:.2f} was processed. New balance: {account.balance:.2f}'
         )
 
+    def apply_batch(self, transactions: Iterable[Transaction]) -> List[TransactionResult]:
+        """Apply many deposits/withdrawals at once.
+
+        The batch is validated in a single pass against running per-account
+        balances, accepted rows are committed to the ledger in bulk and every
+        account receives one summary notification. Rejections (bad amount,
+        unknown kind, insufficient funds) are reported per item, not raised.
+        """
+        balances: Dict[str, Money] = {}
+        accounts: Dict[str, Account] = {}
+        rejected: Dict[str, int] = {}
+        rows = []
+        results = []
+        for t in transactions:
+            try:
+                amount: Optional[Money] = Money(t.amount)
+            except (ArithmeticError, TypeError, ValueError):
+                amount = None
+            account_id = t.account.account_id
+            if account_id not in accounts:
+                accounts[account_id] = t.account
+                balances[account_id] = t.account.balance
+                rejected[account_id] = 0
+            balance = balances[account_id]
+            error = None
+            if t.kind not in ('deposit', 'withdraw'):
+                error = f'Unknown transaction kind: {t.kind}'
+            elif amount is None:
+                error = f'Invalid amount: {t.amount!r}'
+            elif amount <= 0:
+                error = f'{t.kind.title()} amount must be positive'
+            elif t.kind == 'withdraw' and amount > balance:
+                error = 'Insufficient funds'
+
+            if error is None:
+                balance += amount if t.kind == 'deposit' else -amount
+                balances[account_id] = balance
+                rows.append((account_id, t.kind, amount, balance))
+            else:
+                rejected[account_id] += 1
+            results.append(TransactionResult(t, error is None, balance, error))
+
+        self.ledger.record_many(rows)
+
+        processed: Dict[str, int] = dict.fromkeys(accounts, 0)
+        for account_id, _, _, _ in rows:
+            processed[account_id] += 1
+        for account_id, account in accounts.items():
+            account.balance = balances[account_id]
+            self.notifier.notify(
+                account.email,
+                'Batch processed',
+                f'Hi {account.owner}, {processed[account_id]} transaction(s) processed, '
+                f'{rejected[account_id]} rejected. New balance: {account.balance:.2f}'
+            )
+        return results
+
+
+class ConcurrentTransactionService(TransactionService):
+    """TransactionService that may be shared by many worker threads.
+
+    Each account id hashes to one of `stripes` locks, so the read-modify-write
+    of a balance and its ledger row happen atomically per account while
+    independent accounts proceed under different locks. The ledger is wrapped
+    in a SynchronizedLedger. Notifications are sent while the account's lock
+    is held; pair with QueuedNotificationService to keep that section short.
+    """
+
+    def __init__(self, ledger: Ledger, notifier: NotificationService, stripes: int = 64):
+        if stripes < 1:
+            raise ValueError('stripes must be positive')
+        if not isinstance(ledger, SynchronizedLedger):
+            ledger = SynchronizedLedger(ledger)
+        super().__init__(ledger, notifier)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _stripe(self, account_id: str) -> int:
+        return hash(account_id) % len(self._locks)
+
+    def deposit(self, account: Account, amount: MoneyLike) -> None:
+        with self._locks[self._stripe(account.account_id)]:
+            super().deposit(account, amount)
+
+    def withdraw(self, account: Account, amount: MoneyLike) -> None:
+        with self._locks[self._stripe(account.account_id)]:
+            super().withdraw(account, amount)
+
+    def apply_batch(self, transactions: Iterable[Transaction]) -> List[TransactionResult]:
+        transactions = list(transactions)
+        # Acquire every stripe the batch touches in a fixed order to avoid deadlocks.
+        stripes = sorted({self._stripe(t.account.account_id) for t in transactions})
+        for i in stripes:
+            self._locks[i].acquire()
+        try:
+            return super().apply_batch(transactions)
+        finally:
+            for i in reversed(stripes):
+                self._locks[i].release()
+
 
 class ReportGenerator:
     """Responsible for generating simple textual reports from the ledger."""
 
+    @staticmethod
+    def format_entry(e: Dict) -> str:
+        return f"{e['type'].title():10} {e['amount']:10.2f}  Balance: {e['balance']:10.2f}"
+
+    @staticmethod
+    def iter_statement(account: Account, ledger: Ledger) -> Iterator[str]:
+        """Yield the statement line by line without holding the history in memory."""
+        yield f"Statement for {account.owner} (Account: {account.account_id})"
+        yield '-' * 40
+        for e in ledger.iter_entries(account.account_id):
+            yield ReportGenerator.format_entry(e)
+        yield '-' * 40
+        yield f"Current balance: {account.balance:.2f}"
+
+    @staticmethod
+    def write_statement(account: Account, ledger: Ledger, out: TextIO) -> None:
+        """Stream the statement to a text file (or a socket's makefile('w'))."""
+        for line in ReportGenerator.iter_statement(account, ledger):
+            out.write(line)
+            out.write('\n')
+
     @staticmethod
     def account_statement(account: Account, ledger: Ledger) -> str:
-        entries = ledger.entries_for(account.account_id)
-        lines = [f"Statement for {account.owner} (Account: {account.account_id})", '-' * 40]
-        for e in entries:
-            lines.append(f"{e['type'].title():10} {e['amount']:10.2f}  Balance: {e['balance']:10.2f}")
-        lines.append('-' * 40)
-        lines.append(f"Current balance: {account.balance:.2f}")
-        return '\n'.join(lines)
+        return '\n'.join(ReportGenerator.iter_statement(account, ledger))
+
+
+class IncrementalStatements:
+    """Produces "statement since last run" reports for a ledger.
+
+    For every account it keeps a cursor (number of entries already reported)
+    and the balance at that point, so each run reads only the new entries.
+    The checkpoint advances once a statement has been fully consumed. With a
+    path, checkpoints are loaded from that JSON file; call save() once per
+    run (or use the object as a context manager) to persist them, so they
+    survive restarts (pair it with a FileLedger).
+    """
+
+    def __init__(self, ledger: Ledger, path: Optional[str] = None):
+        self.ledger = ledger
+        self.path = path
+        self._checkpoints: Dict[str, Tuple[int, Optional[Money]]] = {}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def load(self) -> None:
+        with open(self.path) as f:
+            saved = json.load(f)
+        self._checkpoints = {
+            account_id: (cursor, None if cents is None else Money.from_cents(cents))
+            for account_id, (cursor, cents) in saved.items()
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None and self.path is not None:
+            self.save()
+
+    def save(self) -> None:
+        """Write the checkpoints to path atomically (temp file + rename)."""
+        saved = {
+            account_id: [cursor, None if balance is None else balance.cents]
+            for account_id, (cursor, balance) in self._checkpoints.items()
+        }
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(saved, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def checkpoint(self, account_id: str) -> Tuple[int, Optional[Money]]:
+        return self._checkpoints.get(account_id, (0, None))
+
+    def iter_since_last_run(self, account: Account) -> Iterator[str]:
+        cursor, balance = self.checkpoint(account.account_id)
+        yield f"Statement for {account.owner} (Account: {account.account_id}) since entry {cursor}"
+        yield '-' * 40
+        if balance is not None:
+            yield f"Opening balance: {balance:.2f}"
+        count = 0
+        for e in self.ledger.iter_entries(account.account_id, cursor):
+            yield ReportGenerator.format_entry(e)
+            balance = e['balance']
+            count += 1
+        yield '-' * 40
+        yield f"Current balance: {account.balance:.2f}"
+        self._checkpoints[account.account_id] = (
+            cursor + count, None if balance is None else Money(balance)
+        )
+
+    def write_since_last_run(self, account: Account, out: TextIO) -> None:
+        for line in self.iter_since_last_run(account):
+            out.write(line)
+            out.write('\n')
+
+    def since_last_run(self, account: Account) -> str:
+        return '\n'.join(self.iter_since_last_run(account))
 
 
 def main():
@@ -0,0 +1,188 @@
+"""Queued, asynchronous notification dispatch.
+
+Callers hand messages to a NotificationDispatcher, which returns immediately
+and delivers them from background worker threads. The queue is bounded so a
+slow transport applies backpressure instead of growing memory without limit.
+
+Classes:
+ - Message: a single notification (recipient, subject, body).
+ - Transport: protocol for anything that can deliver a batch of messages.
+ - FunctionTransport: adapts a send(recipient, subject, body) callable.
+ - FakeTransport: in-memory transport with injectable latency/failures for offline load tests.
+ - NotificationDispatcher: bounded queue + worker pool with batching, retry/backoff and flush.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Protocol
+
+
+@dataclass(frozen=True)
+class Message:
+    recipient: str
+    subject: str
+    body: str
+
+
+class Transport(Protocol):
+    def send(self, messages: List[Message]) -> None: ...
+
+
+class FunctionTransport:
+    """Delivers messages one by one through an existing send function.
+
+    e.g. FunctionTransport(NotificationService().notify) or
+    FunctionTransport(EmailService().send_email).
+    """
+
+    def __init__(self, send_fn: Callable[[str, str, str], None]):
+        self.send_fn = send_fn
+
+    def send(self, messages: List[Message]) -> None:
+        for m in messages:
+            self.send_fn(m.recipient, m.subject, m.body)
+
+
+class FakeTransport:
+    """Records delivered messages in memory.
+
+    latency is slept once per batch (simulating one round-trip) and the first
+    fail_times calls raise, which makes retry behaviour testable offline.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_times: int = 0):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.sent: List[Message] = []
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    def send(self, messages: List[Message]) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise ConnectionError('fake transport failure')
+            self.sent.extend(messages)
+            self.batches += 1
+
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """Delivers notifications from worker threads via a bounded queue.
+
+    submit() only enqueues; when the queue holds max_queue messages it blocks
+    (or raises queue.Full once put_timeout elapses). Workers drain up to
+    batch_size messages per transport call and retry failed batches with
+    exponential backoff; batches that still fail are kept in dead_letters.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        workers: int = 1,
+        max_queue: int = 10_000,
+        batch_size: int = 100,
+        max_retries: int = 3,
+        backoff: float = 0.05,
+        put_timeout: Optional[float] = None,
+    ):
+        if workers < 1 or batch_size < 1 or max_queue < 1:
+            raise ValueError('workers, batch_size and max_queue must be positive')
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.put_timeout = put_timeout
+        self.sent = 0
+        self.retries = 0
+        self.dead_letters: List[Message] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._run, name=f'notifier-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for w in self._workers:
+            w.start()
+
+    def submit(self, recipient: str, subject: str, body: str) -> None:
+        if self._closed:
+            raise RuntimeError('dispatcher is closed')
+        self._queue.put(Message(recipient, subject, body), timeout=self.put_timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted message was delivered or dead-lettered.
+
+        Returns False if timeout elapsed first.
+        """
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def close(self) -> None:
+        """Drain the queue and stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for w in self._workers:
+            w.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._deliver(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _deliver(self, batch: List[Message]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.transport.send(batch)
+            except Exception:
+                if attempt == self.max_retries:
+                    with self._stats_lock:
+                        self.dead_letters.extend(batch)
+                    return
+                with self._stats_lock:
+                    self.retries += 1
+                time.sleep(self.backoff * (2 ** attempt))
+            else:
+                with self._stats_lock:
+                    self.sent += len(batch)
+                return
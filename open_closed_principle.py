@@ -5,8 +5,31 @@ PaymentMethod implementations. Each payment method implements a common
 interface (process) so the processor doesn't need to change when new methods
 are added.
 
+charge_all can run sequentially (the default) or fan out over a thread pool
+with a per-method timeout, a global deadline and a concurrency cap.
+
+AsyncPaymentMethod is the coroutine-based counterpart of PaymentMethod; the
+processor runs such methods on its own background event loop, so both kinds
+can be registered side by side. GatewayPayment shows an async method that
+reuses pooled connections, and StubGatewayServer is a local gateway with
+injectable latency for tests and benchmarks.
+
+charge_many streams a large iterable of (method index, amount) charges in
+batches; methods may override process_batch to submit a whole batch at once.
+
+Every registered method gets a MethodHealth tracker (rolling error rate and
+latency plus a circuit breaker); methods whose circuit is open are skipped,
+and charge() routes a payment through the fastest healthy method first.
+
 """
+import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 
 class PaymentMethod(ABC):
@@ -14,6 +37,26 @@ class PaymentMethod(ABC):
     def process(self, amount: float) -> bool:
         """Process the payment of the given amount. Return True on success."""
 
+    def process_batch(self, amounts: List[float]) -> List[bool]:
+        """Process many payments; override to submit them in one round-trip."""
+        results = []
+        for amount in amounts:
+            try:
+                results.append(bool(self.process(amount)))
+            except Exception:
+                results.append(False)
+        return results
+
+
+class AsyncPaymentMethod(ABC):
+    @abstractmethod
+    async def process(self, amount: float) -> bool:
+        """Asynchronously process the payment. Return True on success."""
+
+    async def process_batch(self, amounts: List[float]) -> List[bool]:
+        results = await asyncio.gather(*(self.process(a) for a in amounts), return_exceptions=True)
+        return [r is True for r in results]
+
 
 class CreditCardPayment(PaymentMethod):
     def __init__(self, card_number: str):
@@ -34,31 +77,346 @@ class PaypalPayment(PaymentMethod):
         return True
 
 
+class _EventLoopThread:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='payments-loop', daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class MethodHealth:
+    """Rolling health stats and circuit breaker for one payment method.
+
+    The last `window` calls are kept as (success, latency). Once at least
+    `min_calls` are recorded and the error rate reaches `failure_threshold`
+    the circuit opens and calls are refused. After `open_seconds` it becomes
+    half-open: a single trial call is let through, closing the circuit on
+    success and re-opening it on failure.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        window: int = 50,
+        failure_threshold: float = 0.5,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.calls = 0
+        self.rejected = 0
+        self._window = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._error_rate()
+
+    def _error_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(1 for ok, _ in self._window if not ok) / len(self._window)
+
+    @property
+    def avg_latency(self) -> Optional[float]:
+        with self._lock:
+            if not self._window:
+                return None
+            return sum(latency for _, latency in self._window) / len(self._window)
+
+    def allow(self) -> bool:
+        """Return True if a call may go through now (reserving the half-open trial)."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self._window.append((ok, latency))
+            state = self._current_state()
+            if state == self.HALF_OPEN:
+                self._trial_in_flight = False
+                if ok:
+                    self._state = self.CLOSED
+                    self._window.clear()
+                else:
+                    self._trip()
+            elif (
+                state == self.CLOSED
+                and len(self._window) >= self.min_calls
+                and self._error_rate() >= self.failure_threshold
+            ):
+                self._trip()
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+
+    def metrics(self) -> dict:
+        avg = self.avg_latency
+        return {
+            'state': self.state,
+            'calls': self.calls,
+            'rejected': self.rejected,
+            'error_rate': round(self.error_rate, 4),
+            'avg_latency_ms': round(avg * 1000, 3) if avg is not None else None,
+        }
+
+
 class PaymentProcessor:
     """Processor depends on PaymentMethod abstraction, not concrete types."""
 
-    def __init__(self):
+    def __init__(self, health_factory: Callable[[], MethodHealth] = MethodHealth):
         self.methods = []
+        self.health: List[MethodHealth] = []
+        self.health_factory = health_factory
+        self._loop_thread: Optional[_EventLoopThread] = None
+        self._loop_lock = threading.Lock()
 
-    def register_method(self, method: PaymentMethod):
-        if not isinstance(method, PaymentMethod):
-            raise TypeError("method must implement PaymentMethod")
+    def register_method(self, method):
+        if not isinstance(method, (PaymentMethod, AsyncPaymentMethod)):
+            raise TypeError("method must implement PaymentMethod or AsyncPaymentMethod")
         self.methods.append(method)
+        self.health.append(self.health_factory())
+
+    def health_metrics(self) -> dict:
+        """Mapping of method index -> health metrics (state, error rate, latency...)."""
+        return {i: h.metrics() for i, h in enumerate(self.health)}
+
+    def _run_async(self, coro):
+        with self._loop_lock:
+            if self._loop_thread is None:
+                self._loop_thread = _EventLoopThread()
+        return self._loop_thread.run(coro)
+
+    def close(self) -> None:
+        """Release async methods' resources and stop the background event loop."""
+        with self._loop_lock:
+            if self._loop_thread is None:
+                return
+            for method in self.methods:
+                if isinstance(method, AsyncPaymentMethod) and hasattr(method, 'aclose'):
+                    self._loop_thread.run(method.aclose())
+            self._loop_thread.stop()
+            self._loop_thread = None
+
+    def _safe_process_batch(self, method, amounts: List[float]) -> List[bool]:
+        try:
+            if isinstance(method, AsyncPaymentMethod):
+                results = self._run_async(method.process_batch(amounts))
+            else:
+                results = method.process_batch(amounts)
+            results = [bool(r) for r in results]
+        except Exception:
+            return [False] * len(amounts)
+        if len(results) != len(amounts):
+            return [False] * len(amounts)
+        return results
+
+    def _safe_process(self, method, amount: float) -> bool:
+        try:
+            if isinstance(method, AsyncPaymentMethod):
+                return bool(self._run_async(method.process(amount)))
+            return bool(method.process(amount))
+        except Exception:
+            return False
+
+    def _call(self, i: int, amount: float, timeout: Optional[float] = None) -> bool:
+        """Charge through method i, honouring and updating its circuit breaker."""
+        health = self.health[i]
+        if not health.allow():
+            return False
+        start = time.monotonic()
+        ok = self._safe_process(self.methods[i], amount)
+        latency = time.monotonic() - start
+        if timeout is not None and latency > timeout:
+            ok = False
+        health.record(ok, latency)
+        return ok
+
+    def charge(self, amount: float) -> Optional[int]:
+        """Charge once, trying the most reliable, then fastest, methods first.
 
-    def charge_all(self, amount: float) -> dict:
+        Methods with an open circuit are skipped. The rest are ranked by
+        error rate and then by average latency, so a method that fails fast
+        does not jump the queue; methods without data yet are tried first so
+        they get measured. Returns the index of the method that succeeded, or
+        None.
+        """
+        candidates = []
+        for i, health in enumerate(self.health):
+            state = health.state
+            if state == MethodHealth.OPEN:
+                continue
+            latency = health.avg_latency
+            candidates.append((state == MethodHealth.HALF_OPEN, health.error_rate, latency or 0.0, i))
+        for *_, i in sorted(candidates):
+            if self._call(i, amount):
+                return i
+        return None
+
+    def charge_all(
+        self,
+        amount: float,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> dict:
         """Charge the amount using all registered methods.
 
         Returns a mapping of method index -> boolean success.
+
+        With none of the keyword arguments the methods run one after another.
+        Otherwise they run concurrently on at most max_workers threads; a
+        method that has not finished within `timeout` seconds of starting, or
+        before the overall `deadline` (seconds from now), counts as a failure.
+        Timed-out calls are abandoned, not cancelled. If every worker is held
+        by an abandoned call, the methods still queued fail at once instead of
+        waiting behind them.
         """
-        results = {}
-        for i, method in enumerate(self.methods):
-            try:
-                success = method.process(amount)
-            except Exception:
-                success = False
-            results[i] = bool(success)
+        if max_workers is None and timeout is None and deadline is None:
+            return {i: self._call(i, amount) for i in range(len(self.methods))}
+        if not self.methods:
+            return {}
+
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+        workers = max_workers or len(self.methods)
+        started = {}
+
+        def run(i: int) -> bool:
+            started[i] = time.monotonic()
+            return self._call(i, amount, timeout)
+
+        results = dict.fromkeys(range(len(self.methods)), False)
+        abandoned = []
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='charge')
+        try:
+            pending = {pool.submit(run, i): i for i in range(len(self.methods))}
+            while pending:
+                now = time.monotonic()
+                limits = [stop_at] if stop_at is not None else []
+                if timeout is not None:
+                    limits += [started[i] + timeout for i in pending.values() if i in started]
+                wait_for = max(0.0, min(limits) - now) if limits else None
+                if timeout is not None and len(started) < len(self.methods):
+                    # unstarted calls get their own timeout once a worker picks them up
+                    wait_for = 0.01 if wait_for is None else min(wait_for, 0.01)
+                done, _ = wait(pending, timeout=wait_for, return_when='FIRST_COMPLETED')
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+
+                now = time.monotonic()
+                if stop_at is not None and now >= stop_at:
+                    break
+                if timeout is not None:
+                    for future, i in list(pending.items()):
+                        if i in started and now - started[i] >= timeout:
+                            del pending[future]
+                            abandoned.append(future)
+                    if sum(not f.done() for f in abandoned) >= workers:
+                        break  # all workers are stuck; queued methods stay False
+            for future in pending:
+                future.cancel()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
         return results
 
+    def charge_many(
+        self, charges: Iterable[Tuple[int, float]], batch_size: int = 1000
+    ) -> Iterator[Tuple[int, float, bool]]:
+        """Charge many (method index, amount) pairs, yielding results as they complete.
+
+        Charges are consumed batch_size at a time; within a batch each method
+        receives its amounts through one process_batch call. Results are yielded
+        as (method index, amount, success) in input order, one batch at a time,
+        so memory stays bounded by batch_size. Unknown indexes yield False.
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        batch = []
+        for charge in charges:
+            batch.append(charge)
+            if len(batch) == batch_size:
+                yield from self._charge_batch(batch)
+                batch = []
+        if batch:
+            yield from self._charge_batch(batch)
+
+    def _charge_batch(self, batch: List[Tuple[int, float]]) -> Iterator[Tuple[int, float, bool]]:
+        by_method = {}
+        for pos, (index, amount) in enumerate(batch):
+            by_method.setdefault(index, []).append(pos)
+        success = [False] * len(batch)
+        for index, positions in by_method.items():
+            if not 0 <= index < len(self.methods):
+                continue
+            health = self.health[index]
+            if health.state == MethodHealth.HALF_OPEN:
+                # Only the first amount goes through as the trial; the rest
+                # follow only if it closes the circuit.
+                trial, positions = positions[:1], positions[1:]
+                if not self._send_batch(index, batch, trial, success):
+                    continue
+            if positions:
+                self._send_batch(index, batch, positions, success)
+        for (index, amount), ok in zip(batch, success):
+            yield index, amount, ok
+
+    def _send_batch(
+        self, index: int, batch: List[Tuple[int, float]], positions: List[int], success: List[bool]
+    ) -> bool:
+        """Send batch[positions] to one method if its breaker allows; True if all succeeded."""
+        health = self.health[index]
+        if not health.allow():
+            return False
+        start = time.monotonic()
+        results = self._safe_process_batch(self.methods[index], [batch[p][1] for p in positions])
+        latency = (time.monotonic() - start) / len(positions)
+        for ok in results:
+            health.record(ok, latency)
+        for pos, ok in zip(positions, results):
+            success[pos] = ok
+        return all(results)
+
 
 # Example of extending without modifying PaymentProcessor: a new method
 class CryptoPayment(PaymentMethod):
@@ -70,6 +428,128 @@ class CryptoPayment(PaymentMethod):
         return True
 
 
+class ConnectionPool:
+    """Reusable asyncio stream connections to one host:port.
+
+    At most `size` connections are open at once; idle ones are handed to the
+    next caller instead of opening a fresh connection per charge. A pool is
+    bound to the event loop it is first used on.
+    """
+
+    def __init__(self, host: str, port: int, size: int = 4):
+        if size < 1:
+            raise ValueError('size must be positive')
+        self.host = host
+        self.port = port
+        self.size = size
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    @asynccontextmanager
+    async def session(self):
+        async with self._slots:
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                conn = await asyncio.open_connection(self.host, self.port)
+                self.opened += 1
+            try:
+                yield conn
+            except BaseException:
+                conn[1].close()
+                raise
+            self._idle.append(conn)
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            await writer.wait_closed()
+
+
+class GatewayPayment(AsyncPaymentMethod):
+    """Charges through a line-based gateway ("<amount>\\n" -> "OK\\n") over pooled connections."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    async def process(self, amount: float) -> bool:
+        async with self.pool.session() as (reader, writer):
+            writer.write(f"{amount:.2f}\n".encode())
+            await writer.drain()
+            reply = await reader.readline()
+        return reply == b"OK\n"
+
+    async def process_batch(self, amounts: List[float]) -> List[bool]:
+        """Pipeline the whole batch over one pooled connection."""
+        async with self.pool.session() as (reader, writer):
+            writer.write(''.join(f"{amount:.2f}\n" for amount in amounts).encode())
+            await writer.drain()
+            return [await reader.readline() == b"OK\n" for _ in amounts]
+
+    async def aclose(self) -> None:
+        await self.pool.close()
+
+
+class StubGatewayServer:
+    """Local gateway for tests/benchmarks, served from a background thread.
+
+    Each connection handles one request at a time and every request sleeps
+    `latency` seconds before answering OK (or DECLINED for amounts <= 0).
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = '127.0.0.1'):
+        self.latency = latency
+        self.host = host
+        self.port: Optional[int] = None
+        self.connections = 0
+        self.requests = 0
+        self._loop_thread: Optional[_EventLoopThread] = None
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while line := await reader.readline():
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(b"OK\n" if float(line) > 0 else b"DECLINED\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def start(self) -> 'StubGatewayServer':
+        self._loop_thread = _EventLoopThread()
+
+        async def serve():
+            return await asyncio.start_server(self._handle, self.host, 0)
+
+        self._server = self._loop_thread.run(serve())
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        if self._loop_thread is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            self._server.close_clients()
+            await self._server.wait_closed()
+
+        self._loop_thread.run(shutdown())
+        self._loop_thread.stop()
+        self._loop_thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
 def main():
     processor = PaymentProcessor()
     processor.register_method(CreditCardPayment('4242-4242-4242-4242'))
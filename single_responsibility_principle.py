@@ -4,6 +4,8 @@ User class: Handles user data (name and email). It has a single responsibility o
 EmailService class: Handles sending emails. It has a single responsibility of managing email communication.
 UserRegistration class: Handles user registration. It has a single responsibility of registering users and 
 coordinating between the User and EmailService classes.
+QueuedEmailService class: Same interface as EmailService, but only enqueues the email on a
+NotificationDispatcher (see notification_dispatcher.py) so registration does not wait on I/O.
 This design ensures that each class has a single reason to change, adhering to the SRP.
 
 
@@ -22,6 +24,14 @@ class EmailService:
         print(f"Subject: {subject}")
         print(f"Body: {body}")
 
+# Class responsible for handing emails to a background dispatcher
+class QueuedEmailService(EmailService):
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    def send_email(self, email, subject, body):
+        self.dispatcher.submit(email, subject, body)
+
 # Class responsible for user registration
 class UserRegistration:
     def __init__(self, email_service):
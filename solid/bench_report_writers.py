@@ -0,0 +1,87 @@
+"""Benchmark for the class_based_report writers.
+
+Builds a per-customer/per-day breakdown frame of synthetic rows and times
+JSONReportWriter (one json.dump of the whole report, indent=2) against the
+streaming NDJSON, CSV and columnar writers, plain and compressed. Reports
+rows/s, output size and output MB/s.
+
+Run: python bench_report_writers.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from class_based_report import (
+    ColumnarReportWriter,
+    CSVReportWriter,
+    JSONReportWriter,
+    NDJSONReportWriter,
+)
+
+
+def make_breakdown(n, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Customer {i:06d}" for i in range(max(n // 20, 1))])
+    return pd.DataFrame(
+        {
+            "name": names[rng.integers(0, len(names), n)],
+            "day": (np.datetime64("2023-01-01") + rng.integers(0, 365, n)).astype(str),
+            "order_count": rng.integers(1, 20, n),
+            "total_sales": np.round(rng.uniform(-500, 5000, n), 2),
+        }
+    )
+
+
+def main(n=1_000_000):
+    frame = make_breakdown(n)
+    runs = [
+        (
+            "JSONReportWriter",
+            "json",
+            lambda f, p: JSONReportWriter().write({"rows": f.to_dict("records")}, p),
+        ),
+        ("NDJSONReportWriter", "ndjson", lambda f, p: NDJSONReportWriter().write(f, p)),
+        (
+            "NDJSONReportWriter(gz)",
+            "ndjson.gz",
+            lambda f, p: NDJSONReportWriter(compress=True).write(f, p),
+        ),
+        ("CSVReportWriter", "csv", lambda f, p: CSVReportWriter().write(f, p)),
+        (
+            "CSVReportWriter(gz)",
+            "csv.gz",
+            lambda f, p: CSVReportWriter(compress=True).write(f, p),
+        ),
+        (
+            "ColumnarReportWriter",
+            "npz",
+            lambda f, p: ColumnarReportWriter().write(f, p),
+        ),
+        (
+            "ColumnarReportWriter(zip)",
+            "npz",
+            lambda f, p: ColumnarReportWriter(compress=True).write(f, p),
+        ),
+    ]
+    print(f"{n} breakdown rows")
+    print(f"{'writer':26} {'seconds':>8} {'rows/s':>12} {'MB':>8} {'MB/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, ext, run in runs:
+            path = os.path.join(tmp, f"report.{ext}")
+            start = time.perf_counter()
+            run(frame, path)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path) / 1e6
+            print(
+                f"{label:26} {elapsed:8.2f} {n / elapsed:12,.0f} {size:8.1f} {size / elapsed:8.1f}"
+            )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
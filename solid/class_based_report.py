@@ -1,65 +1,737 @@
+import base64
+import csv
+import gzip
+import hashlib
+import io
 import json
+import math
+import operator
+import os
+import shutil
+import tempfile
+import warnings
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import cached_property, reduce
+from itertools import repeat
 from typing import Protocol
 
+import numpy as np
 import pandas as pd
 
 
 @dataclass
 class ReportConfig:
-    input_file: str
+    input_file: str | list[str]
     output_file: str
     start_date: datetime | None = None
     end_date: datetime | None = None
+    group_by: str | None = None  # a DIMENSIONS key
+    top_k: int | None = None  # keep only the k groups with the highest sales
+
+    def __post_init__(self) -> None:
+        if self.top_k is not None and self.top_k < 1:
+            raise ValueError("top_k must be at least 1")
+
+
+REPORT_COLUMNS = ["date", "name", "price"]
+
+# Group-by dimension -> source column. "product" needs a reader created with
+# extra_columns=("item",).
+DIMENSIONS = {"customer": "name", "product": "item", "day": "date"}
 
 
 class SalesReader(Protocol):
+    """Readers may also offer iter_chunks(file, start, end), which lets them
+    skip rows outside the date range while reading."""
+
     def read(self, file: str) -> pd.DataFrame: ...
 
 
 class CsvSalesReader:
+    def __init__(self, extra_columns: tuple[str, ...] = ()):
+        self.extra_columns = extra_columns
+
     def read(self, file: str) -> pd.DataFrame:
-        return pd.read_csv(file, parse_dates=["date"])
+        return pd.read_csv(
+            file,
+            usecols=REPORT_COLUMNS + list(self.extra_columns),
+            parse_dates=["date"],
+        )
+
+
+_ISO_DATE = r"\d{4}-\d{2}-\d{2}(?:$|[T ])"
+
+
+class ChunkedCsvSalesReader:
+    """Reads only the report columns, chunk by chunk, skipping out-of-range rows.
+
+    When a chunk's dates are all ISO-8601 (YYYY-MM-DD...), it is first
+    narrowed by comparing the raw date strings against the requested days and
+    only the surviving rows are parsed; other chunks are parsed in full and
+    then filtered. Names become a categorical column.
+    """
+
+    def __init__(
+        self,
+        chunksize: int = 1_000_000,
+        price_dtype: str = "float64",
+        extra_columns: tuple[str, ...] = (),
+    ):
+        self.chunksize = chunksize
+        self.price_dtype = price_dtype
+        self.extra_columns = extra_columns
+
+    def read(
+        self, file: str, start: datetime | None = None, end: datetime | None = None
+    ) -> pd.DataFrame:
+        chunks = list(self.iter_chunks(file, start, end))
+        columns = REPORT_COLUMNS + list(self.extra_columns)
+        df = (
+            pd.concat(chunks, ignore_index=True)
+            if chunks
+            else pd.DataFrame(columns=columns)
+        )
+        return df.astype({"name": "category"})
+
+    def iter_chunks(
+        self, file: str, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[pd.DataFrame]:
+        low = start.strftime("%Y-%m-%d") if start else None
+        high = (end + timedelta(days=1)).strftime("%Y-%m-%d") if end else None
+        with pd.read_csv(
+            file,
+            usecols=REPORT_COLUMNS + list(self.extra_columns),
+            dtype={"date": str, "name": str, "price": self.price_dtype}
+            | {column: str for column in self.extra_columns},
+            chunksize=self.chunksize,
+        ) as reader:
+            for chunk in reader:
+                if (low or high) and chunk["date"].str.match(_ISO_DATE, na=True).all():
+                    if low:
+                        chunk = chunk[chunk["date"] >= low]
+                    if high:
+                        chunk = chunk[chunk["date"] < high]
+                chunk = chunk.assign(date=pd.to_datetime(chunk["date"]))
+                if start:
+                    chunk = chunk[chunk["date"] >= pd.Timestamp(start)]
+                if end:
+                    chunk = chunk[chunk["date"] <= pd.Timestamp(end)]
+                yield chunk
+
+
+class CachedSalesReader:
+    """Caches a source file as month-partitioned, memory-mappable columns.
+
+    The first read converts the source (through `source`, a chunked reader)
+    into NumPy column files: dates, name codes and prices per month, sorted
+    by date, plus a manifest and the name dictionary. Pieces written per
+    source chunk are merged into one file per month and column at the end of
+    the build. The cache is keyed by the source's path, mtime and size and is
+    rebuilt when any of them changes. Later reads memory-map only the months
+    overlapping the requested range, without copying dates or prices.
+    """
+
+    COLUMNS = ("date", "name", "price")
+
+    def __init__(
+        self,
+        cache_dir: str = ".sales_cache",
+        source: ChunkedCsvSalesReader | None = None,
+    ):
+        self.cache_dir = cache_dir
+        self.source = source or ChunkedCsvSalesReader()
+
+    def _location(self, file: str) -> tuple[str, str]:
+        path = os.path.abspath(file)
+        st = os.stat(path)
+        directory = os.path.join(
+            self.cache_dir, hashlib.sha1(path.encode()).hexdigest()[:16]
+        )
+        return directory, f"{path}|{st.st_mtime_ns}|{st.st_size}"
+
+    def _manifest(self, file: str) -> tuple[str, dict]:
+        directory, key = self._location(file)
+        manifest_path = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest["key"] == key:
+                return directory, manifest
+        self._build(file, directory, key)
+        with open(manifest_path) as f:
+            return directory, json.load(f)
+
+    def _build(self, file: str, directory: str, key: str) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.cache_dir)
+        codes: dict[str, int] = {}
+        partitions: dict[str, list[str]] = {}
+        for n, chunk in enumerate(self.source.iter_chunks(file)):
+            chunk = chunk.sort_values("date", kind="stable", ignore_index=True)
+            months = chunk["date"].dt.strftime("%Y-%m").fillna("none")
+            name_codes = chunk["name"].map(
+                lambda v: codes.setdefault(v, len(codes)), na_action="ignore"
+            )
+            columns = {
+                "date": chunk["date"].to_numpy(dtype="datetime64[ns]"),
+                "name": name_codes.fillna(-1).to_numpy(dtype=np.int32),
+                "price": chunk["price"].to_numpy(),
+            }
+            for month, rows in months.groupby(months).groups.items():
+                positions = chunk.index.get_indexer(rows)
+                piece = f"{month}-{n}"
+                for column, values in columns.items():
+                    np.save(
+                        os.path.join(staging, f"{piece}.{column}.npy"),
+                        values[positions],
+                    )
+                partitions.setdefault(month, []).append(piece)
+        for month, pieces in partitions.items():
+            partitions[month] = [self._consolidate(staging, month, pieces)]
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump({"key": key, "names": list(codes), "partitions": partitions}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+
+    def _consolidate(self, staging: str, month: str, pieces: list[str]) -> str:
+        """Merge a month's per-chunk pieces into one date-sorted piece."""
+        if len(pieces) == 1:
+            return pieces[0]
+        paths = {
+            column: [os.path.join(staging, f"{piece}.{column}.npy") for piece in pieces]
+            for column in self.COLUMNS
+        }
+        dates = np.concatenate([np.load(path, mmap_mode="r") for path in paths["date"]])
+        order = np.argsort(dates, kind="stable")
+        for column in self.COLUMNS:
+            if column == "date":
+                values = dates[order]
+            else:
+                values = np.concatenate(
+                    [np.load(path, mmap_mode="r") for path in paths[column]]
+                )[order]
+            np.save(os.path.join(staging, f"{month}.{column}.npy"), values)
+            for path in paths[column]:
+                os.remove(path)
+        return month
+
+    def iter_chunks(
+        self, file: str, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[pd.DataFrame]:
+        directory, manifest = self._manifest(file)
+        names = pd.Index(manifest["names"], dtype=object)
+        low = start.strftime("%Y-%m") if start else None
+        high = end.strftime("%Y-%m") if end else None
+        for month, pieces in sorted(manifest["partitions"].items()):
+            if month == "none":
+                if start or end:
+                    continue
+            elif (low and month < low) or (high and month > high):
+                continue
+            for piece in pieces:
+                load = lambda column: np.load(
+                    os.path.join(directory, f"{piece}.{column}.npy"), mmap_mode="r"
+                )
+                yield pd.DataFrame(
+                    {
+                        "date": load("date"),
+                        "name": pd.Categorical.from_codes(
+                            load("name"), categories=names
+                        ),
+                        "price": load("price"),
+                    },
+                    copy=False,
+                )
+
+    def read(
+        self, file: str, start: datetime | None = None, end: datetime | None = None
+    ) -> pd.DataFrame:
+        chunks = list(self.iter_chunks(file, start, end))
+        if not chunks:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        return pd.concat(chunks, ignore_index=True)
+
+
+DateRange = tuple[datetime | None, datetime | None]
 
 
 class DateRangeFilter:
+    """Keeps rows with start <= date <= end.
+
+    Frames already sorted by date are cut with a binary search and returned as
+    slices; otherwise one combined mask is applied. apply_many answers many
+    ranges (e.g. rolling monthly windows) from a single sort.
+    """
+
     def apply(
         self, df: pd.DataFrame, start: datetime | None, end: datetime | None
     ) -> pd.DataFrame:
+        if not start and not end:
+            return df
+        dates = df["date"]
+        if dates.is_monotonic_increasing:
+            lo, hi = self._bounds(dates, start, end)
+            return df.iloc[lo:hi]
+        mask = np.ones(len(df), dtype=bool)
         if start:
-            df = df[df["date"] >= pd.Timestamp(start)]
+            mask &= (dates >= pd.Timestamp(start)).to_numpy()
         if end:
-            df = df[df["date"] <= pd.Timestamp(end)]
-        return df
+            mask &= (dates <= pd.Timestamp(end)).to_numpy()
+        return df[mask]
+
+    def apply_many(
+        self, df: pd.DataFrame, ranges: Iterable[DateRange]
+    ) -> list[pd.DataFrame]:
+        if not df["date"].is_monotonic_increasing:
+            df = df.sort_values(
+                "date", kind="stable", na_position="last", ignore_index=True
+            )
+        dated = df["date"].iloc[: int(df["date"].notna().sum())]
+        windows = []
+        for start, end in ranges:
+            if not start and not end:
+                windows.append(df)
+            else:
+                lo, hi = self._bounds(dated, start, end)
+                windows.append(df.iloc[lo:hi])
+        return windows
+
+    @staticmethod
+    def _bounds(
+        dates: pd.Series, start: datetime | None, end: datetime | None
+    ) -> tuple[int, int]:
+        lo = int(dates.searchsorted(pd.Timestamp(start), side="left")) if start else 0
+        hi = (
+            int(dates.searchsorted(pd.Timestamp(end), side="right"))
+            if end
+            else len(dates)
+        )
+        return lo, max(lo, hi)
 
 
 class Metric(Protocol):
     def compute(self, df: pd.DataFrame) -> dict[str, object]: ...
 
 
-class CustomerCountMetric:
-    def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        return {"number_of_customers": df["name"].nunique()}
+class _Columns:
+    """Column arrays and masks of one frame, each computed at most once."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    @cached_property
+    def price(self) -> np.ndarray:
+        return self.df["price"].to_numpy(dtype="float64")
+
+    @cached_property
+    def cents(self) -> np.ndarray:
+        # Missing prices count as 0, like pandas' skipna sums.
+        return np.rint(np.nan_to_num(self.price * 100)).astype(np.int64)
+
+    @cached_property
+    def positive(self) -> np.ndarray:
+        return self.price > 0
+
+    @cached_property
+    def negative(self) -> np.ndarray:
+        return self.price < 0
+
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter (about 0.8% error with p=14)."""
+
+    def __init__(self, p: int = 14, registers: np.ndarray | None = None):
+        self.p = p
+        self.registers = (
+            registers if registers is not None else np.zeros(1 << p, dtype=np.uint8)
+        )
 
+    @classmethod
+    def from_values(cls, values: pd.Series, p: int = 14) -> "HyperLogLog":
+        hll = cls(p)
+        hll.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        return hll
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        width = 64 - self.p
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        bit_length = np.zeros(len(rest), dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            high = rest >= np.uint64(1 << shift)
+            bit_length += high.astype(np.uint8) * shift
+            rest = np.where(high, rest >> np.uint64(shift), rest)
+        bit_length += (rest > 0).astype(np.uint8)
+        rank = (width + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        return HyperLogLog(self.p, np.maximum(self.registers, other.registers))
+
+    def dump(self) -> dict[str, object]:
+        return {
+            "p": self.p,
+            "registers": base64.b64encode(self.registers.tobytes()).decode(),
+        }
+
+    @classmethod
+    def load(cls, data: dict[str, object]) -> "HyperLogLog":
+        registers = np.frombuffer(
+            base64.b64decode(data["registers"]), dtype=np.uint8
+        ).copy()
+        return cls(data["p"], registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(raw)
+
+
+def _identity(value: object) -> object:
+    return value
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    compute: Callable[[_Columns], object]
+    merge: Callable[[object, object], object]
+    dump: Callable[[object], object] = _identity  # to a JSON-serialisable value
+    load: Callable[[object], object] = _identity
+
+
+# Money is summed in integer cents, so partial results merge exactly.
+AGGREGATES: dict[str, Aggregate] = {
+    "row_count": Aggregate(lambda c: len(c.df), operator.add),
+    "price_cents": Aggregate(lambda c: int(c.cents.sum()), operator.add),
+    "positive_count": Aggregate(lambda c: int(c.positive.sum()), operator.add),
+    "positive_cents": Aggregate(lambda c: int(c.cents[c.positive].sum()), operator.add),
+    "negative_count": Aggregate(lambda c: int(c.negative.sum()), operator.add),
+    "distinct_names": Aggregate(
+        lambda c: set(c.df["name"].dropna().unique()), operator.or_, sorted, set
+    ),
+    "distinct_names_hll": Aggregate(
+        lambda c: HyperLogLog.from_values(c.df["name"].dropna().astype(str)),
+        HyperLogLog.merge,
+        HyperLogLog.dump,
+        HyperLogLog.load,
+    ),
+}
+
+
+def compute_aggregates(df: pd.DataFrame, names: Iterable[str]) -> dict[str, object]:
+    columns = _Columns(df)
+    return {name: AGGREGATES[name].compute(columns) for name in names}
+
+
+def merge_aggregates(a: dict[str, object], b: dict[str, object]) -> dict[str, object]:
+    return {name: AGGREGATES[name].merge(a[name], b[name]) for name in a}
+
+
+class AggregateMetric:
+    """Metric expressed as named aggregates plus a finalize step.
+
+    Declaring the aggregates lets FusedMetricEngine compute those shared by
+    several metrics once, in one pass, and merge them across chunks. The same
+    partial/merge/finalize contract lets a metric be computed per partition
+    and combined afterwards.
+    """
+
+    aggregates: tuple[str, ...] = ()
+
+    def partial(self, df: pd.DataFrame) -> dict[str, object]:
+        return compute_aggregates(df, self.aggregates)
+
+    def merge(self, a: dict[str, object], b: dict[str, object]) -> dict[str, object]:
+        return merge_aggregates(a, b)
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        raise NotImplementedError
 
-class AverageOrderValueMetric:
     def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        sales = df[df["price"] > 0]["price"]
-        avg = sales.mean() if not sales.empty else 0.0
+        return self.finalize(self.partial(df))
+
+
+class CustomerCountMetric(AggregateMetric):
+    aggregates = ("distinct_names",)
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        return {"number_of_customers": len(aggs["distinct_names"])}
+
+
+class ApproxCustomerCountMetric(AggregateMetric):
+    """CustomerCountMetric in constant memory, estimated with HyperLogLog."""
+
+    aggregates = ("distinct_names_hll",)
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        return {"number_of_customers": round(aggs["distinct_names_hll"].estimate())}
+
+
+class AverageOrderValueMetric(AggregateMetric):
+    aggregates = ("positive_count", "positive_cents")
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        count = aggs["positive_count"]
+        avg = aggs["positive_cents"] / count / 100 if count else 0.0
         return {"average_order_value (pre-tax)": round(avg, 2)}
 
 
-class ReturnPercentageMetric:
-    def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        returns = df[df["price"] < 0]
-        pct = (len(returns) / len(df)) * 100 if len(df) > 0 else 0
+class ReturnPercentageMetric(AggregateMetric):
+    aggregates = ("negative_count", "row_count")
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        rows = aggs["row_count"]
+        pct = (aggs["negative_count"] / rows) * 100 if rows > 0 else 0
         return {"percentage_of_returns": round(pct, 2)}
 
 
-class TotalSalesMetric:
-    def compute(self, df: pd.DataFrame) -> dict[str, object]:
-        return {"total_sales_in_period (pre-tax)": round(df["price"].sum(), 2)}
+class TotalSalesMetric(AggregateMetric):
+    aggregates = ("price_cents",)
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        return {"total_sales_in_period (pre-tax)": round(aggs["price_cents"] / 100, 2)}
+
+
+class FusedMetricEngine:
+    """Computes the union of the metrics' aggregates in one pass per frame.
+
+    partial() works on any chunk, merge() combines chunk results and
+    finalize() turns the merged aggregates into the report values.
+    """
+
+    def __init__(self, metrics: list[AggregateMetric]):
+        self.metrics = metrics
+        self.aggregates = list(dict.fromkeys(a for m in metrics for a in m.aggregates))
+
+    @staticmethod
+    def supports(metrics: list[Metric]) -> bool:
+        return all(hasattr(m, "aggregates") and hasattr(m, "finalize") for m in metrics)
+
+    def partial(self, df: pd.DataFrame) -> dict[str, object]:
+        return compute_aggregates(df, self.aggregates)
+
+    def merge(self, a: dict[str, object], b: dict[str, object]) -> dict[str, object]:
+        return merge_aggregates(a, b)
+
+    def finalize(self, aggs: dict[str, object]) -> dict[str, object]:
+        result = {}
+        for metric in self.metrics:
+            result.update(metric.finalize(aggs))
+        return result
+
+    def empty(self) -> dict[str, object]:
+        return self.partial(
+            pd.DataFrame({c: pd.Series(dtype="float64") for c in REPORT_COLUMNS})
+        )
+
+    def accumulate(self, chunks: Iterable[pd.DataFrame]) -> dict[str, object]:
+        state = None
+        for chunk in chunks:
+            part = self.partial(chunk)
+            state = part if state is None else self.merge(state, part)
+        return self.empty() if state is None else state
+
+    def compute(self, chunks: Iterable[pd.DataFrame]) -> dict[str, object]:
+        return self.finalize(self.accumulate(chunks))
+
+
+def _group_sum(codes: np.ndarray, values: np.ndarray | None, groups: int) -> np.ndarray:
+    # float64 bincount weights are exact for integer sums below 2**53 cents.
+    return np.rint(np.bincount(codes, weights=values, minlength=groups)).astype(
+        np.int64
+    )
+
+
+# Per-group versions of the additive AGGREGATES:
+# (columns, group codes, group count) -> one value per group.
+GROUP_AGGREGATES: dict[str, Callable[[_Columns, np.ndarray, int], np.ndarray]] = {
+    "row_count": lambda c, codes, n: _group_sum(codes, None, n),
+    "price_cents": lambda c, codes, n: _group_sum(codes, c.cents, n),
+    "positive_count": lambda c, codes, n: _group_sum(codes[c.positive], None, n),
+    "positive_cents": lambda c, codes, n: _group_sum(
+        codes[c.positive], c.cents[c.positive], n
+    ),
+    "negative_count": lambda c, codes, n: _group_sum(codes[c.negative], None, n),
+}
+
+_DISTINCT_AGGREGATES = ("distinct_names", "distinct_names_hll")
+
+
+class _ExactDistinct:
+    """Stands in for a HyperLogLog when the distinct count is known exactly."""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def estimate(self) -> float:
+        return float(self.count)
+
+
+class GroupedMetricEngine:
+    """FusedMetricEngine per value of a group-by dimension.
+
+    partial() factorizes the key column once (a hash pass) and computes every
+    additive aggregate for all groups with np.bincount; a partial is a frame
+    of int64 totals indexed by key, plus the distinct (key, name) pairs if a
+    metric counts customers. Distinct counts per group are exact. merge()
+    only collects partials and re-aggregates them once their rows outgrow
+    the already reduced part (at least compact_rows), so the cost stays
+    linear in the input. finalize() applies the metrics to each group,
+    optionally only to the top_k groups by sales.
+    """
+
+    def __init__(
+        self,
+        metrics: list[AggregateMetric],
+        dimension: str,
+        compact_rows: int = 1 << 20,
+    ):
+        if dimension not in DIMENSIONS:
+            raise ValueError(
+                f"unknown dimension {dimension!r}, expected one of {sorted(DIMENSIONS)}"
+            )
+        self.metrics = metrics
+        self.dimension = dimension
+        self.column = DIMENSIONS[dimension]
+        self.compact_rows = compact_rows
+        needed = dict.fromkeys(a for m in metrics for a in m.aggregates)
+        self.distinct = any(a in _DISTINCT_AGGREGATES for a in needed)
+        # price_cents always ranks the groups for top_k.
+        self.aggregates = list(
+            dict.fromkeys(
+                ["price_cents", *(a for a in needed if a in GROUP_AGGREGATES)]
+            )
+        )
+        unsupported = [
+            a
+            for a in needed
+            if a not in GROUP_AGGREGATES and a not in _DISTINCT_AGGREGATES
+        ]
+        if unsupported:
+            raise ValueError(f"aggregates {unsupported} cannot be grouped")
+
+    def _keys(self, df: pd.DataFrame) -> pd.Series:
+        if self.column not in df.columns:
+            raise ValueError(
+                f"grouping by {self.dimension} needs a reader that provides "
+                f"{self.column!r}"
+            )
+        if self.dimension == "day":
+            return df["date"].dt.floor("D")
+        return df[self.column].astype(object)
+
+    def partial(self, df: pd.DataFrame) -> dict[str, list[pd.DataFrame]]:
+        keys = self._keys(df)
+        present = keys.notna().to_numpy()
+        if not present.all():
+            df, keys = df[present], keys[present]
+        codes, uniques = pd.factorize(keys)
+        columns = _Columns(df)
+        totals = pd.DataFrame(
+            {
+                name: GROUP_AGGREGATES[name](columns, codes, len(uniques))
+                for name in self.aggregates
+            },
+            index=pd.Index(uniques, name="key"),
+        )
+        state = {"totals": [totals]}
+        if self.distinct:
+            pairs = pd.DataFrame(
+                {"key": keys.to_numpy(), "name": df["name"].astype(object).to_numpy()}
+            )
+            state["pairs"] = [pairs.dropna().drop_duplicates()]
+        return state
+
+    @staticmethod
+    def _reduce(kind: str, parts: list[pd.DataFrame]) -> pd.DataFrame:
+        if len(parts) == 1:
+            return parts[0]
+        if kind == "totals":
+            return pd.concat(parts).groupby(level=0, sort=False).sum()
+        return pd.concat(parts, ignore_index=True).drop_duplicates()
+
+    def merge(
+        self, a: dict[str, list[pd.DataFrame]], b: dict[str, list[pd.DataFrame]]
+    ) -> dict[str, list[pd.DataFrame]]:
+        state = {}
+        for kind in a:
+            parts = a[kind] + b[kind]
+            pending = sum(len(part) for part in parts[1:])
+            if pending >= max(len(parts[0]), self.compact_rows):
+                parts = [self._reduce(kind, parts)]
+            state[kind] = parts
+        return state
+
+    def empty(self) -> dict[str, list[pd.DataFrame]]:
+        frame = pd.DataFrame({c: pd.Series(dtype="float64") for c in REPORT_COLUMNS})
+        frame["name"] = pd.Series(dtype=object)
+        frame[self.column] = pd.Series(
+            dtype="datetime64[ns]" if self.dimension == "day" else object
+        )
+        return self.partial(frame)
+
+    def accumulate(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> dict[str, list[pd.DataFrame]]:
+        state = None
+        for chunk in chunks:
+            part = self.partial(chunk)
+            state = part if state is None else self.merge(state, part)
+        return self.empty() if state is None else state
+
+    def finalize(
+        self, state: dict[str, list[pd.DataFrame]], top_k: int | None = None
+    ) -> dict[str, object]:
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        totals = self._reduce("totals", state["totals"])
+        group_count = len(totals)
+        if top_k is not None:
+            totals = totals.nlargest(top_k, "price_cents", keep="first")
+        else:
+            totals = totals.sort_values("price_cents", ascending=False, kind="stable")
+        names: dict[object, set] = {}
+        if self.distinct:
+            pairs = self._reduce("pairs", state["pairs"])
+            pairs = pairs[pairs["key"].isin(totals.index)]
+            names = {
+                key: set(group)
+                for key, group in pairs.groupby("key", sort=False)["name"]
+            }
+
+        groups = []
+        for key, row in zip(totals.index, totals.to_dict("records")):
+            aggs = {name: int(value) for name, value in row.items()}
+            if self.distinct:
+                distinct = names.get(key, set())
+                aggs["distinct_names"] = distinct
+                aggs["distinct_names_hll"] = _ExactDistinct(len(distinct))
+            label = key.strftime("%Y-%m-%d") if self.dimension == "day" else key
+            result = {self.dimension: label}
+            for metric in self.metrics:
+                result.update(metric.finalize(aggs))
+            groups.append(result)
+        return {
+            "group_by": self.dimension,
+            "group_count": group_count,
+            "groups": groups,
+        }
+
+    def compute(
+        self, chunks: Iterable[pd.DataFrame], top_k: int | None = None
+    ) -> dict[str, object]:
+        return self.finalize(self.accumulate(chunks), top_k)
 
 
 class SalesReportGenerator:
@@ -70,14 +742,111 @@ class SalesReportGenerator:
         self.filterer = filterer
         self.metrics = metrics
 
+    @staticmethod
+    def input_files(config: ReportConfig) -> list[str]:
+        if isinstance(config.input_file, str):
+            return [config.input_file]
+        return list(config.input_file)
+
+    def file_chunks(
+        self, file: str, start: datetime | None, end: datetime | None
+    ) -> Iterator[pd.DataFrame]:
+        if hasattr(self.reader, "iter_chunks"):
+            for chunk in self.reader.iter_chunks(file, start, end):
+                yield self.filterer.apply(chunk, start, end)
+        else:
+            df = self.reader.read(file)
+            yield self.filterer.apply(df, start, end)
+
+    def _chunks(self, config: ReportConfig) -> Iterator[pd.DataFrame]:
+        for file in self.input_files(config):
+            yield from self.file_chunks(file, config.start_date, config.end_date)
+
+    def _engine(
+        self, group_by: str | None
+    ) -> "FusedMetricEngine | GroupedMetricEngine":
+        if group_by is None:
+            return FusedMetricEngine(self.metrics)
+        if not FusedMetricEngine.supports(self.metrics):
+            raise ValueError("grouped reports need aggregate metrics")
+        return GroupedMetricEngine(self.metrics, group_by)
+
     def generate(self, config: ReportConfig) -> dict[str, object]:
-        df = self.reader.read(config.input_file)
-        df = self.filterer.apply(df, config.start_date, config.end_date)
+        if config.group_by:
+            result = self._engine(config.group_by).compute(
+                self._chunks(config), config.top_k
+            )
+        elif FusedMetricEngine.supports(self.metrics):
+            result = FusedMetricEngine(self.metrics).compute(self._chunks(config))
+        else:
+            df = pd.concat(list(self._chunks(config)), ignore_index=True)
+            result = {}
+            for metric in self.metrics:
+                result.update(metric.compute(df))
+        return self._add_period(result, config)
 
-        result = {}
-        for metric in self.metrics:
-            result.update(metric.compute(df))
+    def generate_many(
+        self, configs: list[ReportConfig], writer: "JSONReportWriter | None" = None
+    ) -> list[dict[str, object]]:
+        """Generate several reports while reading each input only once.
+
+        Configs sharing an input are served from one scan over the union of
+        their date ranges; every chunk is sorted once and sliced per config
+        (DateRangeFilter.apply_many). Grouped configs share a scan with others
+        grouped by the same dimension. Reports are returned in config order and,
+        if a writer is given, written to each config's output_file.
+        """
+        reports: list[dict[str, object] | None] = [None] * len(configs)
+        groups: dict[tuple[tuple[str, ...], str | None], list[int]] = {}
+        for i, config in enumerate(configs):
+            groups.setdefault(
+                (tuple(self.input_files(config)), config.group_by), []
+            ).append(i)
 
+        for (files, group_by), members in groups.items():
+            ranges = [(configs[i].start_date, configs[i].end_date) for i in members]
+            starts = [s for s, _ in ranges]
+            ends = [e for _, e in ranges]
+            start = None if None in starts else min(starts)
+            end = None if None in ends else max(ends)
+            chunks = (c for file in files for c in self.file_chunks(file, start, end))
+            if group_by or FusedMetricEngine.supports(self.metrics):
+                engine = self._engine(group_by)
+                states = [None] * len(members)
+                for chunk in chunks:
+                    for k, window in enumerate(self.filterer.apply_many(chunk, ranges)):
+                        part = engine.partial(window)
+                        states[k] = (
+                            part if states[k] is None else engine.merge(states[k], part)
+                        )
+                states = [st if st is not None else engine.empty() for st in states]
+                if group_by:
+                    results = [
+                        engine.finalize(st, configs[i].top_k)
+                        for i, st in zip(members, states)
+                    ]
+                else:
+                    results = [engine.finalize(st) for st in states]
+            else:
+                df = pd.concat(list(chunks), ignore_index=True)
+                results = []
+                for window in self.filterer.apply_many(df, ranges):
+                    result = {}
+                    for metric in self.metrics:
+                        result.update(metric.compute(window))
+                    results.append(result)
+            for i, result in zip(members, results):
+                reports[i] = self._add_period(result, configs[i])
+
+        if writer is not None:
+            for config, report in zip(configs, reports):
+                writer.write(report, config.output_file)
+        return reports
+
+    @staticmethod
+    def _add_period(
+        result: dict[str, object], config: ReportConfig
+    ) -> dict[str, object]:
         result["report_start"] = (
             config.start_date.strftime("%Y-%m-%d") if config.start_date else "N/A"
         )
@@ -87,12 +856,394 @@ class SalesReportGenerator:
         return result
 
 
+def _partition_state(
+    generator: SalesReportGenerator,
+    file: str,
+    start: datetime | None,
+    end: datetime | None,
+) -> dict[str, object]:
+    engine = FusedMetricEngine(generator.metrics)
+    return engine.accumulate(generator.file_chunks(file, start, end))
+
+
+class ParallelSalesReportGenerator(SalesReportGenerator):
+    """Computes each input file's partial aggregates in a separate process.
+
+    Partials are merged in the parent, so multi-file inputs scale with the
+    number of processes. Reader, filter and metrics must be picklable.
+    """
+
+    def __init__(
+        self,
+        reader: SalesReader,
+        filterer: DateRangeFilter,
+        metrics: list[Metric],
+        processes: int | None = None,
+    ):
+        super().__init__(reader, filterer, metrics)
+        self.processes = processes
+
+    def generate(self, config: ReportConfig) -> dict[str, object]:
+        files = self.input_files(config)
+        if (
+            len(files) < 2
+            or config.group_by
+            or not FusedMetricEngine.supports(self.metrics)
+        ):
+            return super().generate(config)
+        engine = FusedMetricEngine(self.metrics)
+        with ProcessPoolExecutor(self.processes) as pool:
+            states = pool.map(
+                _partition_state,
+                repeat(self),
+                files,
+                repeat(config.start_date),
+                repeat(config.end_date),
+            )
+            state = reduce(engine.merge, states)
+        return self._add_period(engine.finalize(state), config)
+
+
+class IncrementalSalesReportGenerator(SalesReportGenerator):
+    """Keeps reports over an append-only CSV up to date in O(new rows).
+
+    After each run the merged aggregate state, the byte offset just past the
+    last complete line and a fingerprint of the bytes before it are saved to
+    `state_file`. The next run with the same file, date range and metrics
+    parses only the lines appended since; if the file was truncated or
+    rewritten it starts over. A last line without its newline is counted in
+    the report but not saved, so it is read again once complete; one with
+    missing fields is skipped with a warning. Assumes one record per line and
+    a CSV reader (the new bytes are handed to it as an in-memory buffer).
+    """
+
+    def __init__(
+        self,
+        reader: SalesReader,
+        filterer: DateRangeFilter,
+        metrics: list[Metric],
+        state_file: str,
+        block_size: int = 64 << 20,
+    ):
+        super().__init__(reader, filterer, metrics)
+        self.state_file = state_file
+        self.block_size = block_size
+
+    @staticmethod
+    def _fingerprint(f, offset: int) -> str:
+        f.seek(max(0, offset - 64))
+        return base64.b64encode(f.read(min(offset, 64))).decode()
+
+    def _load_state(self, identity: dict[str, object], f) -> dict[str, object] | None:
+        if not os.path.exists(self.state_file):
+            return None
+        with open(self.state_file) as sf:
+            saved = json.load(sf)
+        if saved["identity"] != identity:
+            return None
+        f.seek(0, os.SEEK_END)
+        if (
+            f.tell() < saved["offset"]
+            or self._fingerprint(f, saved["offset"]) != saved["fingerprint"]
+        ):
+            return None
+        return saved
+
+    def _blocks(self, f, offset: int) -> Iterator[bytes]:
+        """Yield the complete lines from offset on, block_size bytes at a time."""
+        f.seek(offset)
+        carry = b""
+        while block := f.read(self.block_size):
+            block = carry + block
+            cut = block.rfind(b"\n") + 1
+            carry = block[cut:]
+            if cut:
+                yield block[:cut]
+
+    def generate(self, config: ReportConfig) -> dict[str, object]:
+        files = self.input_files(config)
+        if (
+            len(files) != 1
+            or config.group_by
+            or not FusedMetricEngine.supports(self.metrics)
+        ):
+            raise ValueError(
+                "incremental reports need one input file, aggregate metrics "
+                "and no grouping"
+            )
+        engine = FusedMetricEngine(self.metrics)
+        start, end = config.start_date, config.end_date
+        identity = {
+            "file": os.path.abspath(files[0]),
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "aggregates": engine.aggregates,
+        }
+        with open(files[0], "rb") as f:
+            header = f.readline()
+            saved = self._load_state(identity, f)
+            if saved is None:
+                state, offset = engine.empty(), len(header)
+            else:
+                state = {n: AGGREGATES[n].load(v) for n, v in saved["state"].items()}
+                offset = saved["offset"]
+            for block in self._blocks(f, offset):
+                for chunk in self.file_chunks(io.BytesIO(header + block), start, end):
+                    state = engine.merge(state, engine.partial(chunk))
+                offset += len(block)
+            fingerprint = self._fingerprint(f, offset)
+            f.seek(offset)
+            tail = f.read()
+
+        # A last line without its newline is counted in this report but not
+        # saved, so it is read again once the line is complete.
+        report_state = state
+        if tail.strip():
+            if self._complete_record(header, tail):
+                for chunk in self.file_chunks(io.BytesIO(header + tail), start, end):
+                    report_state = engine.merge(report_state, engine.partial(chunk))
+            else:
+                warnings.warn(
+                    f"{files[0]}: skipped an incomplete last line ({len(tail)} bytes)",
+                    stacklevel=2,
+                )
+
+        saved = {
+            "identity": identity,
+            "offset": offset,
+            "fingerprint": fingerprint,
+            "state": {n: AGGREGATES[n].dump(v) for n, v in state.items()},
+        }
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w") as sf:
+            json.dump(saved, sf)
+        os.replace(tmp, self.state_file)
+        return self._add_period(engine.finalize(report_state), config)
+
+    @staticmethod
+    def _complete_record(header: bytes, tail: bytes) -> bool:
+        """True if tail parses as exactly one record with all the header's fields."""
+        try:
+            rows = list(csv.reader(io.StringIO((header + tail).decode())))
+        except (UnicodeDecodeError, csv.Error):
+            return False
+        return len(rows) == 2 and len(rows[1]) == len(rows[0])
+
+
+class ReportWriter(Protocol):
+    def write(self, report: dict[str, object], output_file: str) -> None: ...
+
+
 class JSONReportWriter:
     def write(self, report: dict[str, object], output_file: str) -> None:
         with open(output_file, "w") as f:
             json.dump(report, f, indent=2)
 
 
+type ReportRows = dict[str, object] | Iterable[dict[str, object]] | pd.DataFrame
+
+
+def _frames(report: ReportRows, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Split a report (one dict, an iterable of row dicts or a frame) into frames."""
+    if isinstance(report, pd.DataFrame):
+        for pos in range(0, len(report), chunk_rows):
+            yield report.iloc[pos : pos + chunk_rows]
+        return
+    rows = [report] if isinstance(report, dict) else report
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk_rows:
+            yield pd.DataFrame.from_records(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame.from_records(batch)
+
+
+def _uniform(frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Reorder every frame to the first frame's columns; missing ones become NA."""
+    columns = None
+    for frame in frames:
+        if columns is None:
+            columns = list(frame.columns)
+        elif list(frame.columns) != columns:
+            unexpected = [c for c in frame.columns if c not in columns]
+            if unexpected:
+                raise ValueError(
+                    f"columns {unexpected} are not in the first rows' columns {columns}"
+                )
+            frame = frame.reindex(columns=columns)
+        yield frame
+
+
+def _publish(tmp: str, output_file: str) -> None:
+    """Move tmp into place with the umask-derived mode (mkstemp uses 0600)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp, 0o666 & ~umask)
+    os.replace(tmp, output_file)
+
+
+@contextmanager
+def _atomic_output(
+    output_file: str, compress: bool, buffer_size: int
+) -> Iterator[io.BufferedIOBase]:
+    """Buffered binary stream to a temp file renamed over output_file on success."""
+    directory = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with open(fd, "wb", buffering=buffer_size) as raw:
+            if compress:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as zipped:
+                    out = io.BufferedWriter(zipped, buffer_size)
+                    yield out
+                    out.flush()
+            else:
+                yield raw
+        _publish(tmp, output_file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class NDJSONReportWriter:
+    """Writes one JSON object per line, streaming frames of chunk_rows rows.
+
+    Output goes to a temp file that is atomically renamed into place and is
+    gzip-compressed when compress is true.
+    """
+
+    def __init__(
+        self,
+        compress: bool = False,
+        chunk_rows: int = 100_000,
+        buffer_size: int = 1 << 20,
+    ):
+        self.compress = compress
+        self.chunk_rows = chunk_rows
+        self.buffer_size = buffer_size
+
+    def write(self, report: ReportRows, output_file: str) -> None:
+        with _atomic_output(output_file, self.compress, self.buffer_size) as out:
+            for frame in _frames(report, self.chunk_rows):
+                if frame.empty:
+                    continue
+                text = frame.to_json(
+                    orient="records", lines=True, date_format="iso", default_handler=str
+                )
+                out.write(text.encode())
+                if not text.endswith("\n"):
+                    out.write(b"\n")
+
+
+class CSVReportWriter:
+    """Streams rows as CSV, atomically and optionally gzipped.
+
+    The header comes from the first rows; later rows are written in that
+    column order, with missing keys left empty and unknown keys rejected.
+    """
+
+    def __init__(
+        self,
+        compress: bool = False,
+        chunk_rows: int = 100_000,
+        buffer_size: int = 1 << 20,
+    ):
+        self.compress = compress
+        self.chunk_rows = chunk_rows
+        self.buffer_size = buffer_size
+
+    def write(self, report: ReportRows, output_file: str) -> None:
+        with _atomic_output(output_file, self.compress, self.buffer_size) as out:
+            text = io.TextIOWrapper(
+                out, encoding="utf-8", newline="", write_through=True
+            )
+            header = True
+            for frame in _uniform(_frames(report, self.chunk_rows)):
+                frame.to_csv(
+                    text, header=header, index=False, quoting=csv.QUOTE_MINIMAL
+                )
+                header = False
+            text.flush()
+            text.detach()
+
+
+class ColumnarReportWriter:
+    """Writes rows column-wise as NumPy arrays inside a zip archive.
+
+    Each frame of chunk_rows rows becomes one .npy member per column
+    ("<column>/<chunk>.npy"); text is stored as fixed-width unicode so no
+    pickling is involved, with missing values recorded in a
+    "<column>/<chunk>.null.npy" mask. Columns are fixed by the first rows,
+    as in CSVReportWriter. Read it back with read_columnar_report.
+    """
+
+    def __init__(self, compress: bool = False, chunk_rows: int = 100_000):
+        self.compress = compress
+        self.chunk_rows = chunk_rows
+
+    def write(self, report: ReportRows, output_file: str) -> None:
+        directory = os.path.dirname(os.path.abspath(output_file))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        os.close(fd)
+        method = zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
+        try:
+            with zipfile.ZipFile(
+                tmp, "w", compression=method, allowZip64=True
+            ) as archive:
+                columns: list[str] = []
+                for n, frame in enumerate(_uniform(_frames(report, self.chunk_rows))):
+                    columns = columns or [str(c) for c in frame.columns]
+                    for column in frame.columns:
+                        values = frame[column].to_numpy()
+                        if values.dtype == object:
+                            missing = pd.isna(values)
+                            if missing.any():
+                                self._write(
+                                    archive, f"{column}/{n:08d}.null.npy", missing
+                                )
+                                values = np.where(missing, "", values)
+                            values = values.astype(str)
+                        self._write(archive, f"{column}/{n:08d}.npy", values)
+                archive.writestr("columns.json", json.dumps(columns))
+            _publish(tmp, output_file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _write(archive: zipfile.ZipFile, name: str, values: np.ndarray) -> None:
+        with archive.open(name, "w", force_zip64=True) as member:
+            np.lib.format.write_array(member, values, allow_pickle=False)
+
+
+def read_columnar_report(path: str) -> pd.DataFrame:
+    with zipfile.ZipFile(path) as archive:
+        columns = json.loads(archive.read("columns.json"))
+        names = set(archive.namelist())
+
+        def load(name: str) -> np.ndarray:
+            with archive.open(name) as member:
+                return np.lib.format.read_array(member, allow_pickle=False)
+
+        data = {}
+        for column in columns:
+            parts = []
+            for name in sorted(
+                n
+                for n in names
+                if n.startswith(f"{column}/") and not n.endswith(".null.npy")
+            ):
+                values = load(name)
+                mask_name = name[: -len(".npy")] + ".null.npy"
+                if mask_name in names:
+                    values = values.astype(object)
+                    values[load(mask_name)] = None
+                parts.append(values)
+            data[column] = np.concatenate(parts) if parts else np.array([])
+    return pd.DataFrame(data)
+
+
 def main() -> None:
     config = ReportConfig(
         input_file="sales_data.csv",
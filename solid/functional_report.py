@@ -1,4 +1,7 @@
+import gzip
 import json
+import os
+import tempfile
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable
@@ -17,17 +20,54 @@ class ReportConfig:
 
 
 def read_sales(file: str) -> pd.DataFrame:
-    return pd.read_csv(file, parse_dates=["date"])
+    return pd.read_csv(
+        file,
+        usecols=["date", "name", "price"],
+        dtype={"name": "category"},
+        parse_dates=["date"],
+    )
+
+
+def _date_bounds(
+    dates: pd.Series, start: datetime | None, end: datetime | None
+) -> tuple[int, int]:
+    lo = int(dates.searchsorted(pd.Timestamp(start), side="left")) if start else 0
+    hi = int(dates.searchsorted(pd.Timestamp(end), side="right")) if end else len(dates)
+    return lo, max(lo, hi)
 
 
 def filter_sales(
     df: pd.DataFrame, start: datetime | None, end: datetime | None
 ) -> pd.DataFrame:
+    if not start and not end:
+        return df
+    if df["date"].is_monotonic_increasing:
+        lo, hi = _date_bounds(df["date"], start, end)
+        return df.iloc[lo:hi]
+    mask = pd.Series(True, index=df.index)
     if start:
-        df = df[df["date"] >= pd.Timestamp(start)]
+        mask &= df["date"] >= pd.Timestamp(start)
     if end:
-        df = df[df["date"] <= pd.Timestamp(end)]
-    return df
+        mask &= df["date"] <= pd.Timestamp(end)
+    return df[mask]
+
+
+def filter_sales_many(
+    df: pd.DataFrame, ranges: list[tuple[datetime | None, datetime | None]]
+) -> list[pd.DataFrame]:
+    if not df["date"].is_monotonic_increasing:
+        df = df.sort_values(
+            "date", kind="stable", na_position="last", ignore_index=True
+        )
+    dated = df["date"].iloc[: int(df["date"].notna().sum())]
+    windows = []
+    for start, end in ranges:
+        if not start and not end:
+            windows.append(df)
+        else:
+            lo, hi = _date_bounds(dated, start, end)
+            windows.append(df.iloc[lo:hi])
+    return windows
 
 
 def customer_count_metric(df: pd.DataFrame) -> dict[str, Any]:
@@ -68,6 +108,31 @@ def write_report(data: dict[str, Any], filename: str):
         json.dump(data, f, indent=2)
 
 
+def write_rows(
+    rows: pd.DataFrame, filename: str, chunk_rows: int = 100_000, compress: bool = False
+):
+    """Stream a breakdown frame as NDJSON, gzipped if compress, via a temp file."""
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)), prefix=".tmp-"
+    )
+    os.close(fd)
+    try:
+        opener = gzip.open if compress else open
+        with opener(tmp, "wt", encoding="utf-8") as f:
+            for pos in range(0, len(rows), chunk_rows):
+                text = rows.iloc[pos : pos + chunk_rows].to_json(
+                    orient="records", lines=True, date_format="iso"
+                )
+                f.write(text if text.endswith("\n") else text + "\n")
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)  # mkstemp creates the file as 0600
+        os.replace(tmp, filename)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 def main() -> None:
     config = ReportConfig(
         input_file="sales_data.csv",
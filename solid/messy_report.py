@@ -9,7 +9,7 @@ class SalesReader(Protocol):
 
 class CSVSalesReader:
     def read(self, input_file: str) -> pd.DataFrame:
-        return pd.read_csv(input_file, parse_dates=["date"])
+        return pd.read_csv(input_file, usecols=["date", "name", "price"], dtype={"name": "category"}, parse_dates=["date"])
     
 class ReportWriter(Protocol):
     def write(self, output_file: str, report: dict[str, Any]) -> None:
@@ -24,11 +24,16 @@ class DataRangeFilter:
         self.start_date = start_date
         self.end_date = end_date
     def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df["date"].is_monotonic_increasing:
+            lo = df["date"].searchsorted(pd.Timestamp(self.start_date), side="left") if self.start_date else 0
+            hi = df["date"].searchsorted(pd.Timestamp(self.end_date), side="right") if self.end_date else len(df)
+            return df.iloc[lo:max(lo, hi)]
+        mask = pd.Series(True, index=df.index)
         if self.start_date:
-            df = df[df["date"] >= self.start_date]
+            mask &= df["date"] >= self.start_date
         if self.end_date:
-            df = df[df["date"] <= self.end_date]
-        return df   
+            mask &= df["date"] <= self.end_date
+        return df[mask]
     
 class Metric(Protocol):
     def compute(self, df: pd.DataFrame) -> dict[str, Any]:
@@ -38,9 +43,8 @@ class CustomerCountMetric:
         return {"number_of_customers": df["name"].nunique()}
 class AverageOrderValueMetric:
     def compute(self, df)->dict[str,Any]:
-        avg_order = (
-            df[df["price"] > 0]["price"].mean() if not df[df["price"] > 0].empty else 0
-        )
+        sales = df.loc[df["price"] > 0, "price"]
+        avg_order = sales.mean() if not sales.empty else 0
         return {"average_order_value (pre-tax)": round(avg_order, 2)}
 class ReturnPercentageMetric:
     def compute(self, df)->dict[str,Any]:
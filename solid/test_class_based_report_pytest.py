@@ -0,0 +1,489 @@
+import json
+import os
+import shutil
+import warnings
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import class_based_report as cbr
+
+SALES = os.path.join(os.path.dirname(__file__), "sales_data.csv")
+
+
+def all_metrics():
+    return [
+        cbr.CustomerCountMetric(),
+        cbr.AverageOrderValueMetric(),
+        cbr.ReturnPercentageMetric(),
+        cbr.TotalSalesMetric(),
+    ]
+
+
+def reference_report(file, start=None, end=None):
+    """The original pipeline: read_csv, boolean mask, per-metric compute."""
+    df = pd.read_csv(file, parse_dates=["date"])
+    if start:
+        df = df[df["date"] >= pd.Timestamp(start)]
+    if end:
+        df = df[df["date"] <= pd.Timestamp(end)]
+    report = {
+        "number_of_customers": df["name"].nunique(),
+        "average_order_value (pre-tax)": round(df[df["price"] > 0]["price"].mean(), 2),
+        "percentage_of_returns": round((df["price"] < 0).sum() / len(df) * 100, 2),
+        "total_sales_in_period (pre-tax)": round(df["price"].sum(), 2),
+    }
+    return report
+
+
+def without_period(report):
+    return {k: v for k, v in report.items() if k not in ("report_start", "report_end")}
+
+
+@pytest.fixture
+def sales_copy(tmp_path):
+    path = tmp_path / "sales.csv"
+    shutil.copy(SALES, path)
+    return path
+
+
+def incremental(tmp_path):
+    return cbr.IncrementalSalesReportGenerator(
+        cbr.ChunkedCsvSalesReader(),
+        cbr.DateRangeFilter(),
+        all_metrics(),
+        str(tmp_path / "state.json"),
+    )
+
+
+def test_incremental_report_follows_appends(tmp_path, sales_copy):
+    lines = sales_copy.read_bytes().splitlines(keepends=True)
+    sales_copy.write_bytes(b"".join(lines[:30]))
+    generator = incremental(tmp_path)
+    config = cbr.ReportConfig(str(sales_copy), "unused.json")
+    generator.generate(config)
+
+    with open(sales_copy, "ab") as f:
+        f.write(b"".join(lines[30:]))
+    assert without_period(generator.generate(config)) == reference_report(SALES)
+
+
+def test_incremental_report_counts_last_line_without_newline(tmp_path, sales_copy):
+    sales_copy.write_bytes(sales_copy.read_bytes().rstrip(b"\n"))
+    generator = incremental(tmp_path)
+    config = cbr.ReportConfig(str(sales_copy), "unused.json")
+    assert without_period(generator.generate(config)) == reference_report(SALES)
+    # the unterminated line was not saved, so it is not counted twice
+    with open(sales_copy, "ab") as f:
+        f.write(b"\n")
+    assert without_period(generator.generate(config)) == reference_report(SALES)
+
+
+def test_incremental_report_skips_torn_last_line(tmp_path, sales_copy):
+    generator = incremental(tmp_path)
+    config = cbr.ReportConfig(str(sales_copy), "unused.json")
+    generator.generate(config)
+    with open(sales_copy, "ab") as f:
+        f.write(b'"Torn Customer","1 Road","Mouse","2024-05-0')
+    with pytest.warns(UserWarning, match="incomplete last line"):
+        report = generator.generate(config)
+    assert without_period(report) == reference_report(SALES)
+
+    with open(sales_copy, "ab") as f:
+        f.write(b'7",100.0,21.0\n')
+    report = generator.generate(config)
+    assert (
+        report["number_of_customers"]
+        == reference_report(SALES)["number_of_customers"] + 1
+    )
+    assert without_period(report) == reference_report(str(sales_copy))
+
+
+def test_incremental_report_starts_over_after_rewrite(tmp_path, sales_copy):
+    generator = incremental(tmp_path)
+    config = cbr.ReportConfig(str(sales_copy), "unused.json")
+    generator.generate(config)
+
+    lines = sales_copy.read_bytes().splitlines(keepends=True)
+    sales_copy.write_bytes(lines[0] + b"".join(reversed(lines[1:])) + lines[5])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        report = generator.generate(config)
+    assert without_period(report) == reference_report(str(sales_copy))
+
+
+def sales_frame():
+    return pd.read_csv(SALES, usecols=["name", "date", "price"])
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_streaming_writers_round_trip(tmp_path, compress):
+    frame = sales_frame()
+    ndjson, csv_file, columnar = (
+        str(tmp_path / n) for n in ("r.ndjson", "r.csv", "r.npz")
+    )
+    cbr.NDJSONReportWriter(compress=compress, chunk_rows=7).write(frame, ndjson)
+    cbr.CSVReportWriter(compress=compress, chunk_rows=7).write(frame, csv_file)
+    cbr.ColumnarReportWriter(compress=compress, chunk_rows=7).write(frame, columnar)
+
+    compression = "gzip" if compress else None
+    pd.testing.assert_frame_equal(
+        pd.read_json(ndjson, lines=True, compression=compression, dtype=False), frame
+    )
+    pd.testing.assert_frame_equal(pd.read_csv(csv_file, compression=compression), frame)
+    pd.testing.assert_frame_equal(
+        cbr.read_columnar_report(columnar), frame, check_dtype=False
+    )
+    assert sorted(os.listdir(tmp_path)) == ["r.csv", "r.ndjson", "r.npz"]
+
+
+def test_csv_writer_keeps_first_rows_column_order(tmp_path):
+    path = tmp_path / "rows.csv"
+    cbr.CSVReportWriter(chunk_rows=1).write(
+        [{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"a": 5}], str(path)
+    )
+    assert path.read_text().splitlines() == ["a,b", "1,2", "4,3", "5,"]
+    with pytest.raises(ValueError):
+        cbr.CSVReportWriter(chunk_rows=1).write([{"a": 1}, {"a": 2, "c": 3}], str(path))
+    assert (
+        path.read_text().splitlines()[0] == "a,b"
+    )  # the failed write left it untouched
+
+
+def test_writers_use_default_file_mode(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        for writer, name in [
+            (cbr.JSONReportWriter(), "r.json"),
+            (cbr.NDJSONReportWriter(), "r.ndjson"),
+            (cbr.CSVReportWriter(compress=True), "r.csv.gz"),
+            (cbr.ColumnarReportWriter(), "r.npz"),
+        ]:
+            writer.write({"a": 1}, str(tmp_path / name))
+            assert os.stat(tmp_path / name).st_mode & 0o777 == 0o644
+    finally:
+        os.umask(umask)
+
+
+def test_columnar_writer_keeps_missing_text_missing(tmp_path):
+    path = str(tmp_path / "rows.npz")
+    rows = [
+        {"name": "x", "v": 1.0},
+        {"name": None, "v": 2.0},
+        {"name": "nan", "v": 3.0},
+    ]
+    cbr.ColumnarReportWriter(chunk_rows=2).write(rows, path)
+    names = cbr.read_columnar_report(path)["name"]
+    assert names.isna().tolist() == [False, True, False]
+    assert names[2] == "nan"
+
+
+def reference_groups(dimension, column, start=None, end=None):
+    df = pd.read_csv(SALES, parse_dates=["date"])
+    if start:
+        df = df[(df["date"] >= pd.Timestamp(start)) & (df["date"] <= pd.Timestamp(end))]
+    expected = {}
+    for key, group in df.groupby(column):
+        label = key.strftime("%Y-%m-%d") if dimension == "day" else key
+        expected[label] = reference_report_of(group)
+    return expected
+
+
+def reference_report_of(df):
+    return {
+        "number_of_customers": df["name"].nunique(),
+        "average_order_value (pre-tax)": (
+            round(df[df["price"] > 0]["price"].mean(), 2)
+            if (df["price"] > 0).any()
+            else 0.0
+        ),
+        "percentage_of_returns": round((df["price"] < 0).sum() / len(df) * 100, 2),
+        "total_sales_in_period (pre-tax)": round(df["price"].sum(), 2),
+    }
+
+
+@pytest.mark.parametrize("dimension", sorted(cbr.DIMENSIONS))
+def test_grouped_report_matches_groupby(dimension):
+    reader = cbr.ChunkedCsvSalesReader(chunksize=7, extra_columns=("item",))
+    generator = cbr.SalesReportGenerator(reader, cbr.DateRangeFilter(), all_metrics())
+    start, end = datetime(2024, 1, 1), datetime(2024, 6, 30)
+    config = cbr.ReportConfig(SALES, "unused.json", start, end, group_by=dimension)
+    report = generator.generate(config)
+
+    expected = reference_groups(dimension, cbr.DIMENSIONS[dimension], start, end)
+    groups = {g.pop(dimension): g for g in report["groups"]}
+    assert groups == expected
+    assert report["group_count"] == len(expected)
+    sales = [g["total_sales_in_period (pre-tax)"] for g in report["groups"]]
+    assert sales == sorted(sales, reverse=True)
+
+    top = generator.generate(
+        cbr.ReportConfig(SALES, "unused.json", start, end, dimension, top_k=3)
+    )
+    assert [g[dimension] for g in top["groups"]] == list(groups)[:3]
+
+
+def test_grouped_engine_compaction_does_not_change_result():
+    reader = cbr.ChunkedCsvSalesReader(chunksize=3)
+    eager = cbr.GroupedMetricEngine(all_metrics(), "customer", compact_rows=1)
+    lazy = cbr.GroupedMetricEngine(all_metrics(), "customer")
+    chunks = list(reader.iter_chunks(SALES))
+    state = eager.accumulate(chunks)
+    assert len(state["totals"]) < len(chunks)  # partials were reduced along the way
+    assert eager.finalize(state) == lazy.compute(chunks)
+
+
+@pytest.mark.parametrize("dimension", sorted(cbr.DIMENSIONS))
+def test_grouped_report_without_rows_is_empty(dimension):
+    reader = cbr.CsvSalesReader(extra_columns=("item",))
+    generator = cbr.SalesReportGenerator(reader, cbr.DateRangeFilter(), all_metrics())
+    config = cbr.ReportConfig(
+        SALES, "unused.json", datetime(2030, 1, 1), group_by=dimension
+    )
+    report = generator.generate(config)
+    assert report["groups"] == [] and report["group_count"] == 0
+    engine = cbr.GroupedMetricEngine(all_metrics(), dimension)
+    assert engine.finalize(engine.empty())["groups"] == []
+
+
+RANGES = [
+    (None, None),
+    (datetime(2024, 1, 1), datetime(2024, 12, 31)),
+    (datetime(2024, 7, 1), datetime(2024, 9, 30)),
+    (datetime(2030, 1, 1), None),
+]
+
+
+def reference_rows(start=None, end=None):
+    df = pd.read_csv(SALES, usecols=["date", "name", "price"], parse_dates=["date"])
+    if start:
+        df = df[df["date"] >= pd.Timestamp(start)]
+    if end:
+        df = df[df["date"] <= pd.Timestamp(end)]
+    return df
+
+
+def same_rows(actual, expected):
+    key = ["date", "name", "price"]
+    actual = actual[key].astype({"name": object}).sort_values(key, ignore_index=True)
+    expected = expected[key].sort_values(key, ignore_index=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+@pytest.mark.parametrize("chunksize", [1, 7, 1000])
+def test_chunked_reader_matches_read_csv(start, end, chunksize):
+    reader = cbr.ChunkedCsvSalesReader(chunksize=chunksize)
+    same_rows(reader.read(SALES, start, end), reference_rows(start, end))
+    assert sum(len(c) for c in reader.iter_chunks(SALES, start, end)) == len(
+        reference_rows(start, end)
+    )
+
+
+@pytest.mark.parametrize("start, end", RANGES[:3])
+def test_chunked_reader_reports_match_original_pipeline(start, end):
+    generator = cbr.SalesReportGenerator(
+        cbr.ChunkedCsvSalesReader(chunksize=7), cbr.DateRangeFilter(), all_metrics()
+    )
+    report = generator.generate(cbr.ReportConfig(SALES, "unused.json", start, end))
+    assert without_period(report) == reference_report(SALES, start, end)
+
+
+class RowCountMetric:
+    """A plain Metric without aggregates, which disables the fused engine."""
+
+    def compute(self, df):
+        return {"rows": len(df)}
+
+
+def test_fused_engine_matches_per_metric_compute():
+    df = reference_rows()
+    engine = cbr.FusedMetricEngine(all_metrics())
+    assert sorted(engine.aggregates) == sorted(
+        set(a for m in all_metrics() for a in m.aggregates)
+    )
+    expected = {}
+    for metric in all_metrics():
+        expected.update(metric.compute(df))
+    assert engine.compute([df]) == expected == reference_report(SALES)
+    assert engine.compute([df.iloc[:20], df.iloc[20:]]) == expected
+
+
+def test_generator_falls_back_for_metrics_without_aggregates():
+    metrics = [*all_metrics(), RowCountMetric()]
+    assert not cbr.FusedMetricEngine.supports(metrics)
+    generator = cbr.SalesReportGenerator(
+        cbr.CsvSalesReader(), cbr.DateRangeFilter(), metrics
+    )
+    report = without_period(generator.generate(cbr.ReportConfig(SALES, "unused.json")))
+    assert report == {**reference_report(SALES), "rows": 50}
+
+
+def test_partial_aggregates_merge_to_whole_frame_result():
+    df = reference_rows()
+    names = list(cbr.AGGREGATES)
+    whole = cbr.compute_aggregates(df, names)
+    merged = cbr.merge_aggregates(
+        cbr.compute_aggregates(df.iloc[:17], names),
+        cbr.compute_aggregates(df.iloc[17:], names),
+    )
+    for name in names:
+        if name == "distinct_names_hll":
+            assert (merged[name].registers == whole[name].registers).all()
+        else:
+            assert merged[name] == whole[name]
+
+
+def test_hyperloglog_estimates_merges_and_round_trips():
+    values = pd.Series([f"customer-{i}" for i in range(20_000)])
+    left = cbr.HyperLogLog.from_values(values[:12_000])
+    right = cbr.HyperLogLog.from_values(values[8_000:])
+    merged = left.merge(right)
+    assert abs(merged.estimate() - 20_000) / 20_000 < 0.03
+    restored = cbr.HyperLogLog.load(json.loads(json.dumps(merged.dump())))
+    assert restored.estimate() == merged.estimate()
+    assert cbr.ApproxCustomerCountMetric().compute(reference_rows()) == {
+        "number_of_customers": 50
+    }
+
+
+def test_parallel_generator_merges_file_partitions(tmp_path):
+    lines = open(SALES).read().splitlines(keepends=True)
+    files = []
+    for n in range(3):
+        path = tmp_path / f"part{n}.csv"
+        path.write_text(lines[0] + "".join(lines[1 + n :: 3]))
+        files.append(str(path))
+    generator = cbr.ParallelSalesReportGenerator(
+        cbr.ChunkedCsvSalesReader(chunksize=5),
+        cbr.DateRangeFilter(),
+        all_metrics(),
+        processes=2,
+    )
+    for start, end in RANGES[:3]:
+        report = generator.generate(cbr.ReportConfig(files, "unused.json", start, end))
+        assert without_period(report) == reference_report(SALES, start, end)
+
+
+def test_cached_reader_matches_read_csv_and_rebuilds_on_change(tmp_path, sales_copy):
+    reader = cbr.CachedSalesReader(
+        cache_dir=str(tmp_path / "cache"), source=cbr.ChunkedCsvSalesReader(chunksize=7)
+    )
+    for start, end in RANGES:
+        same_rows(reader.read(str(sales_copy), start, end), reference_rows(start, end))
+
+    (directory,) = (tmp_path / "cache").iterdir()
+    manifest = json.loads((directory / "manifest.json").read_text())
+    assert all(len(pieces) == 1 for pieces in manifest["partitions"].values())
+    assert len(list(directory.glob("*.npy"))) == 3 * len(manifest["partitions"])
+    for chunk in reader.iter_chunks(str(sales_copy)):
+        assert chunk["date"].is_monotonic_increasing
+
+    with open(sales_copy, "a") as f:
+        f.write('"New Customer","1 Road","Mouse","2024-08-01",10.0,2.1\n')
+    rows = reader.read(str(sales_copy), datetime(2024, 8, 1), datetime(2024, 8, 1))
+    assert "New Customer" in set(rows["name"])
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_date_filter_sorted_and_unsorted_paths_match_mask(start, end):
+    df = reference_rows()
+    expected = reference_rows(start, end)
+    by_date = df.sort_values("date", kind="stable", ignore_index=True)
+    filterer = cbr.DateRangeFilter()
+    same_rows(filterer.apply(df, start, end), expected)
+    same_rows(filterer.apply(by_date, start, end), expected)
+
+
+def test_date_filter_apply_many_slices_every_range():
+    df = reference_rows()
+    windows = cbr.DateRangeFilter().apply_many(df, RANGES)
+    assert len(windows) == len(RANGES)
+    for window, (start, end) in zip(windows, RANGES):
+        same_rows(window, reference_rows(start, end))
+
+
+def test_generate_many_matches_individual_reports(tmp_path):
+    generator = cbr.SalesReportGenerator(
+        cbr.ChunkedCsvSalesReader(chunksize=7, extra_columns=("item",)),
+        cbr.DateRangeFilter(),
+        all_metrics(),
+    )
+    configs = [
+        cbr.ReportConfig(SALES, str(tmp_path / f"report{n}.json"), start, end)
+        for n, (start, end) in enumerate(RANGES)
+    ]
+    configs.append(
+        cbr.ReportConfig(
+            SALES, str(tmp_path / "products.json"), group_by="product", top_k=2
+        )
+    )
+    reports = generator.generate_many(configs, writer=cbr.JSONReportWriter())
+
+    assert reports == [generator.generate(config) for config in configs]
+    for config, report in zip(configs, reports):
+        with open(config.output_file) as f:
+            assert json.load(f) == report
+
+
+def test_missing_prices_are_skipped_like_pandas(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(
+        "name,address,item,date,price,tax\n"
+        "A,x,Mouse,2024-01-01,5.0,1\n"
+        "B,x,Mouse,2024-01-02,,1\n"
+        "C,x,Mouse,2024-01-02,2.5,1\n"
+    )
+    generator = cbr.SalesReportGenerator(
+        cbr.ChunkedCsvSalesReader(chunksize=2), cbr.DateRangeFilter(), all_metrics()
+    )
+    report = generator.generate(cbr.ReportConfig(str(path), "unused.json"))
+    assert without_period(report) == reference_report(str(path))
+    assert report["total_sales_in_period (pre-tax)"] == 7.5
+
+    config = cbr.ReportConfig(str(path), "unused.json", group_by="day")
+    groups = generator.generate(config)["groups"]
+    assert {g["day"]: g["total_sales_in_period (pre-tax)"] for g in groups} == {
+        "2024-01-01": 5.0,
+        "2024-01-02": 2.5,
+    }
+
+
+class PlainReader:
+    """A reader written against the original read(file) protocol."""
+
+    def read(self, file):
+        return pd.read_csv(file, parse_dates=["date"])
+
+
+@pytest.mark.parametrize("start, end", RANGES[:3])
+def test_generator_accepts_readers_with_only_read_file(start, end):
+    generator = cbr.SalesReportGenerator(
+        PlainReader(), cbr.DateRangeFilter(), all_metrics()
+    )
+    report = generator.generate(cbr.ReportConfig(SALES, "unused.json", start, end))
+    assert without_period(report) == reference_report(SALES, start, end)
+
+
+def test_chunked_reader_filters_non_iso_dates_after_parsing(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(
+        "name,address,item,date,price,tax\n"
+        "A,x,Mouse,1/2/2024,10.0,1\n"
+        "B,x,Mouse,2/3/2024,5.5,1\n"
+        "C,x,Mouse,3/4/2025,1.0,1\n"
+    )
+    start, end = datetime(2024, 1, 1), datetime(2024, 12, 31)
+    rows = cbr.ChunkedCsvSalesReader(chunksize=2).read(str(path), start, end)
+    assert sorted(rows["name"]) == ["A", "B"]
+    assert rows["price"].sum() == 15.5
+
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_top_k_must_be_positive(top_k):
+    with pytest.raises(ValueError):
+        cbr.ReportConfig(SALES, "unused.json", group_by="customer", top_k=top_k)
+    engine = cbr.GroupedMetricEngine(all_metrics(), "customer")
+    with pytest.raises(ValueError):
+        engine.finalize(engine.empty(), top_k)
@@ -15,4 +15,134 @@ def test_optimizer_picks_best_on_simulated_model():
     opt = PromptOptimizer(simulated_model, similarity_score)
     best, score = opt.best_candidate(candidates, dataset)
     assert best.prompt == "Summarize: {input}"
-    assert score > 0.5
\ No newline at end of file
+    assert score > 0.5
+
+
+def test_parallel_cached_evaluation_matches_sequential(tmp_path):
+    from dspy_minimal import ModelCache
+
+    calls = []
+    def counting_model(prompt, params):
+        calls.append(prompt)
+        return simulated_model(prompt, params)
+
+    candidates = [PromptCandidate("Summarize: {input}"), PromptCandidate("Explain in detail: {input}")]
+    dataset = [("Data A", "short summary"), ("Data A", "short summary"), ("Why?", "detailed explanation")]
+
+    baseline = PromptOptimizer(simulated_model, similarity_score).evaluate_candidates(candidates, dataset)
+    path = str(tmp_path / "cache.json")
+    cache = ModelCache(path=path)
+    opt = PromptOptimizer(counting_model, similarity_score, max_workers=4, cache=cache)
+    scored = opt.evaluate_candidates(candidates, dataset)
+
+    assert [s for _, s in scored] == [s for _, s in baseline]
+    assert len(calls) == 4  # the duplicate example is served from the cache
+    assert cache.hits == 2
+
+    cache.save()
+    warm = ModelCache(path=path)
+    PromptOptimizer(counting_model, similarity_score, cache=warm).evaluate_candidates(candidates, dataset)
+    assert len(calls) == 4
+    assert warm.stats()["hit_rate"] == 1.0
+
+
+def test_successive_halving_finds_best_with_fewer_calls():
+    candidates = [PromptCandidate(f"Variant {i}: {{input}}") for i in range(6)]
+    candidates.append(PromptCandidate("Summarize: {input}"))
+    candidates.append(PromptCandidate("Explain in detail: {input}"))
+    dataset = [(f"Data {i}", "short summary") for i in range(16)]
+
+    opt = PromptOptimizer(simulated_model, similarity_score)
+    exhaustive_best, exhaustive_score = opt.best_candidate(candidates, dataset)
+    best, score, stats = opt.successive_halving(candidates, dataset, eta=2, min_examples=2)
+
+    assert best is exhaustive_best
+    assert score == exhaustive_score
+    assert stats["exhaustive_calls"] == 8 * 16
+    assert stats["model_calls"] < stats["exhaustive_calls"] / 2
+    assert stats["calls_saved"] == stats["exhaustive_calls"] - stats["model_calls"]
+
+
+def test_scorer_suite_agrees_on_edit_distance():
+    import random
+    from dspy_minimal import edit_distance, edit_similarity, score_many, token_set_similarity
+
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("kitten", "sitting", max_distance=2) == 3
+    assert edit_distance("", "abc") == 3
+    assert edit_similarity("  same ", "same") == 1.0
+    assert token_set_similarity("a b c", "c b a") == 1.0
+    assert token_set_similarity("a b", "a c") == 1 / 3
+
+    rng = random.Random(0)
+    outputs = ["".join(rng.choice("abc ") for _ in range(rng.randint(0, 30))) for _ in range(200)]
+    expecteds = ["".join(rng.choice("abc ") for _ in range(rng.randint(0, 30))) for _ in range(200)]
+    assert score_many(outputs, expecteds, chunk_size=37) == [
+        edit_similarity(o, e) for o, e in zip(outputs, expecteds)
+    ]
+    for o, e in zip(outputs[:50], expecteds[:50]):
+        d = edit_distance(o, e)
+        assert edit_distance(o, e, max_distance=5) == min(d, 6)
+
+
+def test_optimizer_with_batch_scorer():
+    from dspy_minimal import edit_similarity, score_many
+
+    candidates = [PromptCandidate("Summarize: {input}"), PromptCandidate("Explain in detail: {input}")]
+    dataset = [("Data A", "short summary"), ("Data B", "short summary")]
+    per_item = PromptOptimizer(simulated_model, edit_similarity).evaluate_candidates(candidates, dataset)
+    batched = PromptOptimizer(simulated_model, edit_similarity, batch_scorer_fn=score_many)
+    assert [s for _, s in batched.evaluate_candidates(candidates, dataset)] == [s for _, s in per_item]
+
+
+def test_streaming_jsonl_evaluation_resumes_from_checkpoint(tmp_path):
+    import json
+
+    candidates = [PromptCandidate("Summarize: {input}"), PromptCandidate("Answer in one word: {input}")]
+    rows = [(f"Data {i}", "short summary" if i % 3 else "Data") for i in range(10)]
+    path = tmp_path / "eval.jsonl"
+    path.write_text("".join(json.dumps({"input": i, "expected": e}) + "\n" for i, e in rows))
+
+    opt = PromptOptimizer(simulated_model, similarity_score)
+    expected = opt.evaluate_candidates(candidates, list(rows))
+    assert [s for _, s in opt.evaluate_candidates(candidates, iter(rows), chunk_size=3)] == [s for _, s in expected]
+
+    # interrupt after the first chunk, then resume from the checkpoint
+    checkpoint = str(tmp_path / "ckpt.json")
+    calls = []
+    def flaky_model(prompt, params):
+        calls.append(prompt)
+        if len(calls) > 8:
+            raise KeyboardInterrupt
+        return simulated_model(prompt, params)
+
+    try:
+        PromptOptimizer(flaky_model, similarity_score).evaluate_stream(candidates, str(path), 4, checkpoint)
+    except KeyboardInterrupt:
+        pass
+    assert json.loads(open(checkpoint).read())["examples_seen"] == 4
+
+    resumed = opt.evaluate_stream(candidates, str(path), 4, checkpoint)
+    for (_, stats), (_, avg) in zip(resumed, expected):
+        assert stats.count == 10
+        assert abs(stats.mean - avg) < 1e-12
+    assert resumed[0][1].variance > 0
+
+
+def test_prompt_candidate_precompiles_and_validates_template():
+    import pytest
+
+    plain = PromptCandidate("Q: {input}\nA: {input}")
+    assert plain.render("x") == "Q: {input}\nA: {input}".format(input="x")
+    assert plain.render_many(["a", "b"]) == ["Q: a\nA: a", "Q: b\nA: b"]
+
+    fancy = PromptCandidate("{{literal}} {input!r:>8}|")
+    assert fancy.render("hi") == "{{literal}} {input!r:>8}|".format(input="hi")
+    assert PromptCandidate("no placeholder").render("x") == "no placeholder"
+
+    for template in ["First letter: {input[0]}", "{input.upper} / {input[1]!r:>4}"]:
+        assert PromptCandidate(template).render("hey") == template.format(input="hey")
+
+    for bad in ["Hello {name}", "Hello {}", "unclosed {input", "{input:{width}}", "{input.}", "{input[0]x}"]:
+        with pytest.raises(ValueError):
+            PromptCandidate(bad)
@@ -57,3 +57,308 @@ def test_withdraw_success_records_and_notifies():
 
     notifier.notify.assert_called_once()
     assert acct.balance == 350.0
+
+
+def test_columnar_ledger_matches_list_ledger():
+    plain = fs.Ledger()
+    columnar = fs.ColumnarLedger()
+    rows = [
+        ('A', 'deposit', 100.0, 100.0),
+        ('B', 'deposit', 20.0, 20.0),
+        ('A', 'withdraw', 30.0, 70.0),
+        ('B', 'withdraw', 5.5, 14.5),
+    ]
+    for row in rows:
+        plain.record(*row)
+        columnar.record(*row)
+
+    assert len(columnar) == 4
+    assert columnar.entries_for('A') == plain.entries_for('A')
+    assert columnar.entries_for('B') == plain.entries_for('B')
+    assert columnar.entries_for('missing') == []
+
+
+def test_statement_with_columnar_ledger():
+    ledger = fs.ColumnarLedger()
+    tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+    acct = fs.Account('C1', 'Col User', 'col@example.com', balance=10.0)
+    tx.deposit(acct, 5.0)
+    tx.withdraw(acct, 3.0)
+
+    report = fs.ReportGenerator.account_statement(acct, ledger)
+    assert 'Deposit' in report
+    assert 'Withdraw' in report
+    assert 'Current balance: 12.00' in report
+
+
+def test_apply_batch_rejects_malformed_amounts_per_item():
+    ledger = fs.ColumnarLedger()
+    tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+    acct = fs.Account('M1', 'Malformed', 'm@example.com', balance=5.0)
+    results = tx.apply_batch([
+        fs.Transaction(acct, 'deposit', 'oops'),
+        fs.Transaction(acct, 'deposit', None),
+        fs.Transaction(acct, 'deposit', float('nan')),
+        fs.Transaction(acct, 'deposit', 2.0),
+    ])
+    assert [r.ok for r in results] == [False, False, False, True]
+    assert results[0].error == "Invalid amount: 'oops'"
+    assert acct.balance == 7.0
+    assert len(ledger) == 1
+
+
+def test_columnar_ledger_stays_aligned_after_a_bad_record():
+    ledger = fs.ColumnarLedger()
+    ledger.record('C1', 'deposit', 1.0, 1.0)
+    with pytest.raises(ArithmeticError):
+        ledger.record('C1', 'withdraw', 'oops', 2.0)
+    ledger.record('C1', 'deposit', 2.0, 3.0)
+    assert [(e['type'], e['balance']) for e in ledger.entries_for('C1')] == [
+        ('deposit', 1.0), ('deposit', 3.0)
+    ]
+    assert len(ledger) == 2
+
+
+def test_columnar_ledger_limits_distinct_kinds():
+    ledger = fs.ColumnarLedger()
+    for i in range(300):
+        ledger.record('K1', f'kind{i}', 1.0, 1.0)
+    assert ledger.entries_for('K1')[299]['type'] == 'kind299'
+    ledger.MAX_KINDS = 300
+    with pytest.raises(ValueError):
+        ledger.record('K1', 'one_too_many', 1.0, 1.0)
+    assert len(ledger.entries_for('K1')) == 300
+
+
+def test_apply_batch_reports_rejections_and_coalesces_notifications():
+    ledger = fs.ColumnarLedger()
+    notifier = Mock(spec=fs.NotificationService)
+    tx = fs.TransactionService(ledger, notifier)
+
+    a = fs.Account('B1', 'Batch A', 'a@example.com', balance=10.0)
+    b = fs.Account('B2', 'Batch B', 'b@example.com', balance=0.0)
+    results = tx.apply_batch([
+        fs.Transaction(a, 'withdraw', 15.0),
+        fs.Transaction(a, 'deposit', 10.0),
+        fs.Transaction(a, 'withdraw', 15.0),
+        fs.Transaction(b, 'deposit', -1.0),
+        fs.Transaction(b, 'deposit', 7.0),
+    ])
+
+    assert [r.ok for r in results] == [False, True, True, False, True]
+    assert results[0].error == 'Insufficient funds'
+    assert results[3].error == 'Deposit amount must be positive'
+    assert a.balance == 5.0
+    assert b.balance == 7.0
+    assert [e['balance'] for e in ledger.entries_for('B1')] == [20.0, 5.0]
+    assert len(ledger.entries_for('B2')) == 1
+
+    # one summary notification per account
+    assert notifier.notify.call_count == 2
+
+
+def test_queued_notification_service_delivers_in_background():
+    from notification_dispatcher import FakeTransport, NotificationDispatcher
+
+    transport = FakeTransport()
+    with NotificationDispatcher(transport) as dispatcher:
+        tx = fs.TransactionService(fs.Ledger(), fs.QueuedNotificationService(dispatcher))
+        acct = fs.Account('Q1', 'Queue User', 'queue@example.com')
+        tx.deposit(acct, 25.0)
+        dispatcher.flush()
+
+    assert [(m.recipient, m.subject) for m in transport.sent] == [
+        ('queue@example.com', 'Deposit received')
+    ]
+
+
+def test_file_ledger_persists_across_reopen(tmp_path):
+    path = str(tmp_path / 'ledger.bin')
+    with fs.FileLedger(path, sync_every=2) as ledger:
+        tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+        acct = fs.Account('F1', 'File User', 'file@example.com')
+        tx.deposit(acct, 40.0)
+        tx.withdraw(acct, 15.0)
+        ledger.record('F2', 'deposit', 1.0, 1.0)
+        assert [e['balance'] for e in ledger.entries_for('F1')] == [40.0, 25.0]
+
+    with fs.FileLedger(path) as reopened:
+        assert len(reopened) == 3
+        assert [e['type'] for e in reopened.entries_for('F1')] == ['deposit', 'withdraw']
+        assert reopened.entries_for('F2') == [
+            {'account_id': 'F2', 'type': 'deposit', 'amount': 1.0, 'balance': 1.0}
+        ]
+        report = fs.ReportGenerator.account_statement(acct, reopened)
+        assert 'Current balance: 25.00' in report
+
+
+def test_file_ledger_truncates_torn_and_corrupt_tail(tmp_path):
+    path = tmp_path / 'ledger.bin'
+    with fs.FileLedger(str(path)) as ledger:
+        ledger.record('T1', 'deposit', 10.0, 10.0)
+        ledger.record('T1', 'deposit', 5.0, 15.0)
+
+    data = bytearray(path.read_bytes())
+    data[-10] ^= 0xFF                # corrupt the last full record
+    data += b'\x01\x02\x03'          # and leave a torn partial record behind
+    path.write_bytes(bytes(data))
+
+    with fs.FileLedger(str(path)) as recovered:
+        assert len(recovered) == 1
+        assert recovered.entries_for('T1')[0]['balance'] == 10.0
+    assert path.stat().st_size == fs.FileLedger.RECORD.size
+
+
+def test_file_ledger_rejects_kind_that_would_be_truncated(tmp_path):
+    with fs.FileLedger(str(tmp_path / 'ledger.bin')) as ledger:
+        with pytest.raises(ValueError):
+            ledger.record('A', 'interest_adjustment_credit', 1.0, 1.0)
+        assert len(ledger) == 0
+
+
+def test_file_ledger_record_many_is_all_or_nothing(tmp_path):
+    with fs.FileLedger(str(tmp_path / 'ledger.bin')) as ledger:
+        with pytest.raises(ValueError):
+            ledger.record_many([('A', 'deposit', 1.0, 1.0), ('X' * 40, 'deposit', 1.0, 1.0)])
+        ledger.record('B', 'deposit', 2.0, 2.0)
+        assert ledger.entries_for('A') == []
+        assert [e['balance'] for e in ledger.entries_for('B')] == [2.0]
+        assert len(ledger) == 1
+
+
+def test_file_ledger_streams_while_records_are_appended(tmp_path):
+    with fs.FileLedger(str(tmp_path / 'ledger.bin')) as ledger:
+        ledger.record('S1', 'deposit', 1.0, 1.0)
+        ledger.record('S1', 'deposit', 1.0, 2.0)
+        entries = ledger.iter_entries('S1')
+        first = next(entries)
+        for i in range(500):  # grows the file, so the next read remaps it
+            ledger.record('S2', 'deposit', 1.0, float(i))
+        assert next(ledger.iter_entries('S2'))['balance'] == 0.0
+        assert [first['balance'], next(entries)['balance']] == [1.0, 2.0]
+
+
+def test_concurrent_service_stress_balances_match_ledger():
+    import random
+    import threading
+
+    ledger = fs.ColumnarLedger()
+    tx = fs.ConcurrentTransactionService(ledger, Mock(spec=fs.NotificationService), stripes=4)
+    accounts = [fs.Account(f'S{i}', f'Stress {i}', f's{i}@example.com', balance=100.0) for i in range(6)]
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(1500):
+            acct = rng.choice(accounts)
+            amount = float(rng.randint(1, 20))
+            if rng.random() < 0.5:
+                tx.deposit(acct, amount)
+            else:
+                try:
+                    tx.withdraw(acct, amount)
+                except ValueError:
+                    pass
+            if rng.random() < 0.01:
+                tx.apply_batch([fs.Transaction(a, 'deposit', 1.0) for a in rng.sample(accounts, 3)])
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for acct in accounts:
+        balance = 100.0
+        for e in ledger.entries_for(acct.account_id):
+            balance += e['amount'] if e['type'] == 'deposit' else -e['amount']
+            assert e['balance'] == balance
+            assert balance >= 0
+        assert acct.balance == balance
+
+
+@pytest.mark.parametrize('ledger_cls', [fs.Ledger, fs.ColumnarLedger])
+def test_streamed_statement_matches_account_statement(ledger_cls):
+    import io
+
+    ledger = ledger_cls()
+    tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+    acct = fs.Account('R1', 'Stream User', 'stream@example.com')
+    tx.deposit(acct, 10.0)
+    tx.deposit(acct, 2.5)
+
+    out = io.StringIO()
+    fs.ReportGenerator.write_statement(acct, ledger, out)
+    assert out.getvalue() == fs.ReportGenerator.account_statement(acct, ledger) + '\n'
+
+
+@pytest.mark.parametrize('ledger_cls', [fs.Ledger, fs.ColumnarLedger])
+def test_incremental_statement_reports_only_new_entries(ledger_cls):
+    ledger = ledger_cls()
+    tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+    acct = fs.Account('I1', 'Inc User', 'inc@example.com')
+    statements = fs.IncrementalStatements(ledger)
+
+    tx.deposit(acct, 10.0)
+    first = statements.since_last_run(acct)
+    assert 'Opening balance' not in first
+    assert first.count('Deposit') == 1
+
+    tx.withdraw(acct, 4.0)
+    tx.deposit(acct, 1.0)
+    second = statements.since_last_run(acct)
+    assert 'since entry 1' in second
+    assert 'Opening balance: 10.00' in second
+    assert second.count('Deposit') == 1
+    assert second.count('Withdraw') == 1
+    assert statements.checkpoint('I1') == (3, 7.0)
+
+    third = statements.since_last_run(acct)
+    assert 'Deposit' not in third and 'Withdraw' not in third
+
+
+def test_incremental_statements_checkpoints_survive_restart(tmp_path):
+    ledger_path = str(tmp_path / 'ledger.bin')
+    state_path = str(tmp_path / 'checkpoints.json')
+    acct = fs.Account('R1', 'Restart User', 'restart@example.com')
+    with fs.FileLedger(ledger_path) as ledger:
+        tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+        tx.deposit(acct, 10.0)
+        with fs.IncrementalStatements(ledger, state_path) as statements:
+            statements.since_last_run(acct)
+        tx.withdraw(acct, 4.0)
+
+    with fs.FileLedger(ledger_path) as ledger:
+        statements = fs.IncrementalStatements(ledger, state_path)
+        assert statements.checkpoint('R1') == (1, 10.0)
+        report = statements.since_last_run(acct)
+        assert 'Opening balance: 10.00' in report
+        assert report.count('Withdraw') == 1 and 'Deposit' not in report
+
+
+def test_money_is_exact_and_interoperates_with_numbers():
+    total = fs.Money.sum([0.1] * 10)
+    assert total == 1
+    assert total.cents == 100
+    assert fs.Money('0.10') + 0.2 == 0.3
+    assert 5 - fs.Money('1.25') == fs.Money('3.75')
+    assert f"{fs.Money('1234.5'):10.2f}" == f"{1234.5:10.2f}"
+    assert fs.Money(2) == 2.0 and hash(fs.Money(2)) == hash(2.0)
+
+
+def test_money_equality_is_exact_and_consistent_with_hash():
+    assert fs.Money('0.30') != 0.304
+    assert fs.Money('0.30') < 0.304
+    assert fs.Money('0.10') == 0.1 and hash(fs.Money('0.10')) == hash(0.1)
+    assert len({fs.Money('0.10'), 0.1}) == 1
+    assert fs.Money('0.10') != float('nan')
+
+
+def test_money_balances_do_not_drift():
+    ledger = fs.ColumnarLedger()
+    tx = fs.TransactionService(ledger, Mock(spec=fs.NotificationService))
+    acct = fs.Account('M1', 'Money User', 'money@example.com')
+    for _ in range(1000):
+        tx.deposit(acct, 0.1)
+
+    assert acct.balance == 100
+    assert ledger.entries_for('M1')[-1]['balance'].cents == 10000
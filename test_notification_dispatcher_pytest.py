@@ -0,0 +1,69 @@
+import queue
+import threading
+
+import pytest
+
+import notification_dispatcher as nd
+
+
+def test_dispatcher_delivers_all_messages_in_batches():
+    sending, release = threading.Event(), threading.Event()
+
+    class GatedTransport(nd.FakeTransport):
+        def send(self, messages):
+            sending.set()
+            release.wait()
+            super().send(messages)
+
+    transport = GatedTransport()
+    with nd.NotificationDispatcher(transport, workers=1, batch_size=10) as dispatcher:
+        dispatcher.submit('user0@example.com', 'Hi', 'body')
+        assert sending.wait(5)  # the worker now holds a batch of one
+        for i in range(1, 95):
+            dispatcher.submit(f'user{i}@example.com', 'Hi', 'body')
+        release.set()
+        assert dispatcher.flush(timeout=5)
+
+    assert len(transport.sent) == 95
+    assert dispatcher.sent == 95
+    # the first message alone, then the 94 queued ones in batches of 10
+    assert transport.batches == 11
+
+
+def test_dispatcher_retries_with_backoff_then_succeeds():
+    transport = nd.FakeTransport(fail_times=2)
+    with nd.NotificationDispatcher(transport, backoff=0.001) as dispatcher:
+        dispatcher.submit('a@example.com', 'Hi', 'body')
+        dispatcher.flush()
+
+    assert dispatcher.retries == 2
+    assert dispatcher.dead_letters == []
+    assert [m.recipient for m in transport.sent] == ['a@example.com']
+
+
+def test_dispatcher_dead_letters_after_max_retries():
+    transport = nd.FakeTransport(fail_times=10)
+    with nd.NotificationDispatcher(transport, max_retries=1, backoff=0.001) as dispatcher:
+        dispatcher.submit('a@example.com', 'Hi', 'body')
+        dispatcher.flush()
+
+    assert dispatcher.dead_letters == [nd.Message('a@example.com', 'Hi', 'body')]
+    assert transport.sent == []
+
+
+def test_dispatcher_applies_backpressure_when_queue_is_full():
+    release = threading.Event()
+
+    class BlockingTransport:
+        def send(self, messages):
+            release.wait()
+
+    dispatcher = nd.NotificationDispatcher(
+        BlockingTransport(), max_queue=2, batch_size=1, put_timeout=0.01
+    )
+    dispatcher.submit('a', 's', 'b')  # taken by the worker, which then blocks
+    with pytest.raises(queue.Full):
+        for _ in range(5):
+            dispatcher.submit('a', 's', 'b')
+    release.set()
+    dispatcher.close()
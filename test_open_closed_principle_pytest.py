@@ -38,3 +38,222 @@ def test_real_methods_work(monkeypatch, capsys):
 
     results = processor.charge_all(1.0)
     assert results == {0: True}
+
+
+class SlowPayment(ocp.PaymentMethod):
+    def __init__(self, delay, result=True):
+        self.delay = delay
+        self.result = result
+
+    def process(self, amount):
+        import time
+        time.sleep(self.delay)
+        return self.result
+
+
+def test_parallel_charge_all_runs_concurrently():
+    import time
+
+    processor = ocp.PaymentProcessor()
+    for _ in range(4):
+        processor.register_method(SlowPayment(0.1))
+
+    start = time.monotonic()
+    results = processor.charge_all(1.0, max_workers=4)
+    assert time.monotonic() - start < 0.3
+    assert results == {0: True, 1: True, 2: True, 3: True}
+
+
+def test_parallel_charge_all_times_out_slow_methods():
+    import time
+
+    processor = ocp.PaymentProcessor()
+    processor.register_method(SlowPayment(0.0))
+    processor.register_method(SlowPayment(1.0))
+    processor.register_method(SlowPayment(0.0, result=False))
+
+    start = time.monotonic()
+    results = processor.charge_all(1.0, timeout=0.1)
+    assert time.monotonic() - start < 0.5
+    assert results == {0: True, 1: False, 2: False}
+
+
+def test_parallel_charge_all_respects_global_deadline():
+    import time
+
+    processor = ocp.PaymentProcessor()
+    processor.register_method(SlowPayment(0.0))
+    processor.register_method(SlowPayment(1.0))
+    processor.register_method(SlowPayment(1.0))
+
+    start = time.monotonic()
+    results = processor.charge_all(1.0, max_workers=1, deadline=0.2)
+    assert time.monotonic() - start < 0.5
+    assert results == {0: True, 1: False, 2: False}
+
+
+def test_processor_accepts_sync_and_async_methods():
+    class AsyncOk(ocp.AsyncPaymentMethod):
+        async def process(self, amount):
+            return True
+
+    class AsyncBroken(ocp.AsyncPaymentMethod):
+        async def process(self, amount):
+            raise RuntimeError('gateway down')
+
+    processor = ocp.PaymentProcessor()
+    good = Mock(spec=ocp.PaymentMethod)
+    good.process.return_value = True
+    processor.register_method(good)
+    processor.register_method(AsyncOk())
+    processor.register_method(AsyncBroken())
+    try:
+        assert processor.charge_all(1.0) == {0: True, 1: True, 2: False}
+        assert processor.charge_all(1.0, max_workers=3) == {0: True, 1: True, 2: False}
+    finally:
+        processor.close()
+
+
+def test_gateway_payment_reuses_pooled_connections():
+    with ocp.StubGatewayServer(latency=0.001) as server:
+        pool = ocp.ConnectionPool(server.host, server.port, size=2)
+        processor = ocp.PaymentProcessor()
+        processor.register_method(ocp.GatewayPayment(pool))
+        try:
+            for _ in range(5):
+                assert processor.charge_all(3.0) == {0: True}
+            assert processor.charge_all(-1.0) == {0: False}
+        finally:
+            processor.close()
+
+    assert server.requests == 6
+    assert pool.opened == 1
+
+
+def test_charge_many_streams_batches_in_input_order():
+    class Recording(ocp.PaymentMethod):
+        def __init__(self):
+            self.batches = []
+
+        def process(self, amount):
+            return amount > 0
+
+        def process_batch(self, amounts):
+            self.batches.append(list(amounts))
+            return super().process_batch(amounts)
+
+    first, second = Recording(), Recording()
+    processor = ocp.PaymentProcessor()
+    processor.register_method(first)
+    processor.register_method(second)
+
+    charges = iter([(0, 1.0), (1, 2.0), (0, -3.0), (1, 4.0), (7, 5.0)])
+    results = processor.charge_many(charges, batch_size=2)
+    assert next(results) == (0, 1.0, True)
+    assert first.batches == [[1.0]] and second.batches == [[2.0]]
+    assert list(results) == [(1, 2.0, True), (0, -3.0, False), (1, 4.0, True), (7, 5.0, False)]
+    assert first.batches == [[1.0], [-3.0]]
+    assert second.batches == [[2.0], [4.0]]
+
+
+def test_charge_many_pipelines_gateway_batches():
+    with ocp.StubGatewayServer() as server:
+        pool = ocp.ConnectionPool(server.host, server.port, size=1)
+        processor = ocp.PaymentProcessor()
+        processor.register_method(ocp.GatewayPayment(pool))
+        try:
+            results = list(processor.charge_many(((0, a) for a in (1.0, -1.0, 2.0)), batch_size=10))
+        finally:
+            processor.close()
+
+    assert [ok for _, _, ok in results] == [True, False, True]
+    assert pool.opened == 1
+
+
+def test_circuit_opens_after_failures_and_half_opens_after_cooldown():
+    now = [0.0]
+    processor = ocp.PaymentProcessor(
+        health_factory=lambda: ocp.MethodHealth(window=4, min_calls=4, open_seconds=10, clock=lambda: now[0])
+    )
+    bad = Mock(spec=ocp.PaymentMethod)
+    bad.process.side_effect = RuntimeError('gateway down')
+    processor.register_method(bad)
+
+    for _ in range(6):
+        assert processor.charge_all(1.0) == {0: False}
+    assert bad.process.call_count == 4
+    metrics = processor.health_metrics()[0]
+    assert metrics['state'] == 'open'
+    assert metrics['error_rate'] == 1.0
+    assert metrics['rejected'] == 2
+
+    now[0] = 11.0
+    bad.process.side_effect = None
+    bad.process.return_value = True
+    assert processor.health[0].state == 'half_open'
+    assert processor.charge_all(1.0) == {0: True}
+    assert processor.health[0].state == 'closed'
+
+
+def test_charge_routes_through_fastest_healthy_method():
+    processor = ocp.PaymentProcessor()
+    processor.register_method(SlowPayment(0.02))
+    processor.register_method(SlowPayment(0.0))
+    processor.register_method(SlowPayment(0.0, result=False))
+
+    # first round measures every method
+    processor.charge_all(1.0)
+    assert processor.charge(1.0) == 1
+    assert processor.health_metrics()[1]['calls'] == 2
+    assert processor.health_metrics()[0]['calls'] == 1
+
+
+def test_charge_ranks_failing_methods_after_reliable_ones():
+    processor = ocp.PaymentProcessor()
+    processor.register_method(SlowPayment(0.0, result=False))  # fails fast
+    processor.register_method(SlowPayment(0.01))
+
+    processor.charge_all(1.0)
+    assert processor.charge(1.0) == 1
+    assert processor.charge(1.0) == 1
+    assert processor.health_metrics()[0]['calls'] == 1
+
+
+def test_charge_all_fails_queued_methods_when_workers_hang():
+    import time
+
+    processor = ocp.PaymentProcessor()
+    processor.register_method(SlowPayment(3.0))
+    processor.register_method(SlowPayment(0.0))
+    processor.register_method(SlowPayment(0.0))
+
+    started = time.monotonic()
+    results = processor.charge_all(1.0, max_workers=1, timeout=0.1)
+    assert time.monotonic() - started < 1.0
+    assert results == {0: False, 1: False, 2: False}
+
+
+def test_charge_many_sends_a_single_trial_through_a_half_open_circuit():
+    now = [0.0]
+    processor = ocp.PaymentProcessor(
+        health_factory=lambda: ocp.MethodHealth(window=4, min_calls=4, open_seconds=10, clock=lambda: now[0])
+    )
+    gateway = Mock(spec=ocp.PaymentMethod)
+    gateway.process.return_value = False
+    gateway.process_batch.side_effect = lambda amounts: [gateway.process(a) for a in amounts]
+    processor.register_method(gateway)
+    list(processor.charge_many([(0, 1.0)] * 4))
+    assert processor.health[0].state == 'open'
+
+    now[0] = 11.0
+    gateway.process.reset_mock()
+    results = list(processor.charge_many([(0, 1.0)] * 500))
+    assert gateway.process.call_count == 1
+    assert not any(ok for _, _, ok in results)
+    assert processor.health[0].state == 'open'
+
+    now[0] = 22.0
+    gateway.process.return_value = True
+    results = list(processor.charge_many([(0, 1.0)] * 500))
+    assert all(ok for _, _, ok in results)
+    assert processor.health[0].state == 'closed'
@@ -37,3 +37,19 @@ def test_register_user_with_patch_object(capsys):
 
     captured = capsys.readouterr()
     assert 'User Frank registered successfully.' in captured.out
+
+
+def test_register_user_with_queued_email_service(capsys):
+    """QueuedEmailService hands the welcome email to the dispatcher."""
+    from notification_dispatcher import FakeTransport, Message, NotificationDispatcher
+
+    transport = FakeTransport()
+    with NotificationDispatcher(transport) as dispatcher:
+        registration = srp.UserRegistration(srp.QueuedEmailService(dispatcher))
+        registration.register_user('Gina', 'gina@example.com')
+        dispatcher.flush()
+
+    assert transport.sent == [
+        Message('gina@example.com', 'Welcome!', 'Hello Gina, thank you for registering!')
+    ]
+    assert 'User Gina registered successfully.' in capsys.readouterr().out